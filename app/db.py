@@ -8,20 +8,80 @@ Author: Valentin Leuthe
 
 db = None
 
+# connection pool of the driver: the requests and the scheduled updates share up to 50 connections, 
+# idle connections are kept alive so a request doesn't need a new handshake with the database
+DRIVER_CONFIG = {
+    "max_connection_pool_size": 50,
+    "connection_acquisition_timeout": 30,
+    "keep_alive": True,
+}
+
 def init_db():
     """
     Instanciate a database access
     """
     global db
+    # the driver is created once for the lifetime of the process, a second call keeps the existing connection pool
+    if db is not None:
+        return
     uri = os.getenv("DB_URL")
     username = os.getenv("DB_USR")
     password = os.getenv("DB_PWD")
     logging.info(f"Initializing DB with URI: {uri}, Username: {username}")
-    db = Neo4jInstance(uri, username, password)
+    db = Neo4jInstance(uri, username, password, **DRIVER_CONFIG)
+    logging.info(db.test_connection('neo4j'))
+
+# range indexes for the properties the statistics filter on. The history and equality queries compare the 
+# timestamps as a range of unix timestamps, which lets Neo4j seek the index instead of scanning all relationships
+INDEX_QUERIES = [
+    "CREATE INDEX transacted_timestamp IF NOT EXISTS FOR ()-[r:TRANSACTED]-() ON (r.transaction_timestamp)",
+    "CREATE INDEX transacted_collection_name IF NOT EXISTS FOR ()-[r:TRANSACTED]-() ON (r.collection_name)",
+    "CREATE INDEX mint_date IF NOT EXISTS FOR ()-[r:MINT]-() ON (r.date)",
+    "CREATE INDEX owned_from IF NOT EXISTS FOR ()-[r:OWNED]-() ON (r.from)",
+    # composite indexes for the queries which filter on several properties at once: the transactions of a 
+    # single collection within a time frame and the ownerships by their state and time frame
+    "CREATE INDEX transacted_collection_timestamp IF NOT EXISTS FOR ()-[r:TRANSACTED]-() ON (r.collection_name, r.transaction_timestamp)",
+    "CREATE INDEX owned_range IF NOT EXISTS FOR ()-[r:OWNED]-() ON (r.currently_owned, r.from, r.until)",
+    # the collection of MINT and OWNED is stored on the NFT node, the index lets a collection filter 
+    # start from the NFTs of the collection instead of expanding every relationship
+    "CREATE INDEX nft_collection_name IF NOT EXISTS FOR (n:NFT) ON (n.collection_name)",
+    # a NFT is identified by its collection and identifier, the update and search look it up by both
+    "CREATE INDEX nft_key IF NOT EXISTS FOR (n:NFT) ON (n.collection_name, n.identifier)",
+]
+
+# (constraint, fallback index): an account is identified by its address and merged by the update on it. 
+# The uniqueness constraint can't be created while the database contains duplicate accounts, 
+# in that case a plain index is created instead, so the lookups by address still use an index
+CONSTRAINT_QUERIES = [
+    ("CREATE CONSTRAINT account_address IF NOT EXISTS FOR (a:Account) REQUIRE a.address IS UNIQUE",
+     "CREATE INDEX account_address_index IF NOT EXISTS FOR (a:Account) ON (a.address)"),
+]
+
+def create_indexes():
+    """
+    Creates the indexes and constraints which don't exist yet. 
+    A failing index creation (e.g. missing privileges) is logged and doesn't prevent the application from starting.
+    """
+    for query in INDEX_QUERIES:
+        try:
+            db.run_query('neo4j', query)
+        except Exception as e:
+            logging.error(f"Index could not be created: {e}")
+
+    for constraint_query, index_query in CONSTRAINT_QUERIES:
+        try:
+            db.run_query('neo4j', constraint_query)
+        except Exception as e:
+            logging.warning(f"Constraint could not be created, creating an index instead: {e}")
+            try:
+                db.run_query('neo4j', index_query)
+            except Exception as e:
+                logging.error(f"Index could not be created: {e}")
 
 def get_db():
     """
     returns the database access
+    The driver is created once in init_db() and shared by all requests, it must not be created per request.
     """
-    logging.info("Getting DB instance")
+    logging.debug("Getting DB instance")
     return db
\ No newline at end of file
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Query, HTTPException
 from fastapi_cache.decorator import cache
 from typing import List
 import logging
-from app.neo4j_response_model.neo4j_response_model import HistoryResponse, HistoryResponseCollectionDistribution
+from app.neo4j_response_model.neo4j_response_model import HistoryResponse, HistoryResponseCollectionDistribution, HistoryDashboardResponse
 from app.neo4j_access.history_functionality import HistoryLogic
 
 """
@@ -100,6 +100,28 @@ def get_active_user_history(
     else:
         raise HTTPException(status_code=404, detail="relationship type wrong or doesn't exist")
     
+@history_router.get("/dashboard", response_model=HistoryDashboardResponse)
+@cache(namespace="history-dashboard")
+def get_dashboard_history(
+    year_from: int = Query(2024, description=year_from_description),
+    year_to: int = Query(2024, description=year_to_description),
+    month_from: int = Query(1, description=month_from_description),
+    month_to: int = Query(1, description=month_to_description),
+    collection: List[str] = Query(..., description=collection_description)
+):
+    
+    """
+    Creates all daily histories (transactions, mint events, active users, transacting users and minting users)
+    between the selected dates within the selected collections with a single request.
+    Returns a list of dates and for every history a list of the respective counts on this date.
+    """
+
+    logging.info(f"""request dashboard history for ({year_from}, {month_from}) until ({year_to}, {month_to})
+                 considering the collection(s): {collection}""")
+
+    history_logic = HistoryLogic()
+    return history_logic.get_dashboard_history(year_from, year_to, month_from, month_to, collection)
+
 @history_router.get("/collection_distribution", response_model=HistoryResponseCollectionDistribution)
 @cache(namespace="history-collection-distribution")
 def get_collection_distribution(
@@ -10,6 +10,9 @@ from app.opensea_api.query_api import get_current_blocktime,convert_unix_to_bloc
 from app.db import get_db
 from app.neo4j_access.community_detection import CommunityDetection
 from app.neo4j_access.update_functionality import UpdateFunctionality
+from app.neo4j_access.equality_functionality import clear_count_cache
+from app.neo4j_access.history_functionality import clear_history_cache
+from app.neo4j_access.ranking_functionality import clear_ranking_cache
 from app.stats_com import testing_stats
 update_router = APIRouter()
 
@@ -70,6 +73,9 @@ def convert_unix(unix:int=1619817106):
 
 @update_router.delete("/cache")
 def getJobs():
+    clear_count_cache()
+    clear_history_cache()
+    clear_ranking_cache()
     return delete_cache_keys("application-cache:*")
 
 
@@ -132,17 +132,17 @@ print("Number of accounts with no mint-relationship:", no_mint_nft)
 
 # indegree + outdegree for some specific values 
 for threshold in [2, 5, 10, 15, 20, 30, 40]:
-    query = f"""
+    query = """
         MATCH (n:Account)  
         OPTIONAL MATCH (n)-[r:TRANSACTED]->()  
         WITH n, COUNT(r) AS outdegree  
         OPTIONAL MATCH (n)<-[r:TRANSACTED]-()  
         WITH n, outdegree, COUNT(r) AS indegree  
         WITH n, outdegree + indegree AS totalDegree  
-        WHERE totalDegree < {threshold} 
+        WHERE totalDegree < $threshold 
         RETURN COUNT(n) AS nodesBelowThreshold  
     """
-    degree_below_threshold = run_query(query)
+    degree_below_threshold = run_query(query, {"threshold": threshold})
     print(f"Number of accounts with indegree + outdegree less than {threshold}:", degree_below_threshold)
 
 # maximum indegree + outdegree
@@ -6,14 +6,19 @@ from app.neo4j_access.neo4j_access import Neo4jInstance
 import os
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
-from app.db import init_db, get_db
+from app.db import init_db, get_db, create_indexes
 from app.apscheduler import start_scheduler
 from app.cache import init_cache
+from app.neo4j_access.update_functionality import UpdateFunctionality
 from app.endpoints import community_router, centrality_router, health_router, update_router, search_router, ranking_router, history_router, equality_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     init_db()
+    create_indexes()
+    # one-off migration of the relationships stored before year and month were introduced
+    if os.getenv("BACKFILL_YEAR_MONTH", "false").lower() == "true":
+        UpdateFunctionality().set_year_month_properties()
     init_cache()
     start_scheduler()
     yield
@@ -5,6 +5,17 @@ import datetime
 from app.exceptions.not_exists import NotExistsException
 from app.neo4j_access.utilities import Utilities
 
+def _relationship_node(node, node_pool):
+    # returns the node-object of a relationship end, every node is only converted once and the object is reused
+    node_dict = node_pool.get(node.element_id)
+    if node_dict is None:
+        if 'Account' in node.labels:
+            node_dict = {"value": node["address"], "collection": "", "type": "address"}
+        else:
+            node_dict = {"value": node["identifier"], "collection": node["collection_name"], "type": "identifier"}
+        node_pool[node.element_id] = node_dict
+    return node_dict
+
 class CentralityLogic:
 
     """
@@ -57,39 +68,27 @@ class CentralityLogic:
 
         rels_result = db.run_query('neo4j', relationships_query, {"all_node_ids": all_node_ids})
 
-        # create the Transaction-objects for the response model 
+        # create the Transaction-objects for the response model, the node-objects are shared by all relationships of a node
         relationships = []
+        node_pool = {}
         for rel in rels_result:
             from_node = rel["node"]
             to_node = rel["other"]
             trans_rels = rel["relationships"]
 
-            # Aggregating transaction properties
+            # Aggregating transaction properties, every property list is built in one pass over the transactions
+            transaction_hashes = [trans_rel["transaction_hash"] for trans_rel in trans_rels]
             trans_properties = {
-                "transaction_hash": [],
-                "link": [],
-                "event_type": [],
-                "identifier": [],
-                "collection_name": []
+                "transaction_hash": transaction_hashes,
+                "link": [utilities.get_etherscan_url_transaction(transaction_hash) for transaction_hash in transaction_hashes],
+                "event_type": [trans_rel["event_type"] for trans_rel in trans_rels],
+                "identifier": [trans_rel["identifier"] for trans_rel in trans_rels],
+                "collection_name": [trans_rel["collection_name"] for trans_rel in trans_rels]
             }
-            for trans_rel in trans_rels:
-                trans_properties["transaction_hash"].append(trans_rel["transaction_hash"])
-                trans_properties["link"].append(utilities.get_etherscan_url_transaction(trans_rel["transaction_hash"]))
-                trans_properties["event_type"].append(trans_rel["event_type"])
-                trans_properties["identifier"].append(trans_rel["identifier"])
-                trans_properties["collection_name"].append(trans_rel["collection_name"])
 
             relationships.append({
-                "from_": {
-                    "value": from_node["address"] if 'Account' in from_node.labels else from_node["identifier"],
-                    "collection": "" if 'Account' in from_node.labels else from_node["collection_name"],
-                    "type": "address" if 'Account' in from_node.labels else "identifier"
-                },
-                "to": {
-                    "value": to_node["address"] if 'Account' in to_node.labels else to_node["identifier"],
-                    "collection": "" if 'Account' in to_node.labels else to_node["collection_name"],
-                    "type": "address" if 'Account' in to_node.labels else "identifier"
-                },
+                "from_": _relationship_node(from_node, node_pool),
+                "to": _relationship_node(to_node, node_pool),
                 "relationship": {
                     "property": trans_properties["transaction_hash"],
                     "link": trans_properties["link"],
@@ -131,39 +130,27 @@ class CentralityLogic:
 
         rels_result = db.run_query('neo4j', relationships_query, {"all_node_ids": all_node_ids})
 
-        # create the Transaction-objects for the response model 
+        # create the Transaction-objects for the response model, the node-objects are shared by all relationships of a node
         relationships = []
+        node_pool = {}
         for rel in rels_result:
             from_node = rel["node"]
             to_node = rel["other"]
             trans_rels = rel["relationships"]
 
-            # Aggregating transaction properties
+            # Aggregating transaction properties, the unused properties are preallocated with one entry per relationship
+            relationship_count = len(trans_rels)
             trans_properties = {
-                "currently_owned": [],
-                "link": [],
-                "event_type": [],
-                "identifier": [],
-                "collection_name": []
+                "currently_owned": [str(trans_rel["currently_owned"]) for trans_rel in trans_rels],
+                "link": [""] * relationship_count,
+                "event_type": [""] * relationship_count,
+                "identifier": [""] * relationship_count,
+                "collection_name": [""] * relationship_count
             }
-            for trans_rel in trans_rels:
-                trans_properties["currently_owned"].append(str(trans_rel["currently_owned"]))
-                trans_properties["link"].append("")
-                trans_properties["event_type"].append("")
-                trans_properties["identifier"].append("")
-                trans_properties["collection_name"].append("")
 
             relationships.append({
-                "from_": {
-                    "value": from_node["address"] if 'Account' in from_node.labels else from_node["identifier"],
-                    "collection": "" if 'Account' in from_node.labels else from_node["collection_name"],
-                    "type": "address" if 'Account' in from_node.labels else "identifier"
-                },
-                "to": {
-                    "value": to_node["address"] if 'Account' in to_node.labels else to_node["identifier"],
-                    "collection": "" if 'Account' in to_node.labels else to_node["collection_name"],
-                    "type": "address" if 'Account' in to_node.labels else "identifier"
-                },
+                "from_": _relationship_node(from_node, node_pool),
+                "to": _relationship_node(to_node, node_pool),
                 "relationship": {
                     "property": trans_properties["currently_owned"],
                     "link": trans_properties["link"],
@@ -205,39 +192,27 @@ class CentralityLogic:
 
         rels_result = db.run_query('neo4j', relationships_query, {"all_node_ids": all_node_ids})
 
-        # create the Transaction-objects for the response model 
+        # create the Transaction-objects for the response model, the node-objects are shared by all relationships of a node
         relationships = []
+        node_pool = {}
         for rel in rels_result:
             from_node = rel["node"]
             to_node = rel["other"]
             trans_rels = rel["relationships"]
 
-            # Aggregating transaction properties
+            # Aggregating transaction properties, the unused properties are preallocated with one entry per relationship
+            relationship_count = len(trans_rels)
             trans_properties = {
-                "date": [],
-                "link": [],
-                "event_type": [],
-                "identifier": [],
-                "collection_name": []
+                "date": [str(datetime.datetime.fromtimestamp(trans_rel["date"])) for trans_rel in trans_rels],
+                "link": [""] * relationship_count,
+                "event_type": [""] * relationship_count,
+                "identifier": [""] * relationship_count,
+                "collection_name": [""] * relationship_count
             }
-            for trans_rel in trans_rels:
-                trans_properties["date"].append(str(datetime.datetime.fromtimestamp(trans_rel["date"])))
-                trans_properties["link"].append("")
-                trans_properties["event_type"].append("")
-                trans_properties["identifier"].append("")
-                trans_properties["collection_name"].append("")
 
             relationships.append({
-                "from_": {
-                    "value": from_node["address"] if 'Account' in from_node.labels else from_node["identifier"],
-                    "collection": "" if 'Account' in from_node.labels else from_node["collection_name"],
-                    "type": "address" if 'Account' in from_node.labels else "identifier"
-                },
-                "to": {
-                    "value": to_node["address"] if 'Account' in to_node.labels else to_node["identifier"],
-                    "collection": "" if 'Account' in to_node.labels else to_node["collection_name"],
-                    "type": "address" if 'Account' in to_node.labels else "identifier"
-                },
+                "from_": _relationship_node(from_node, node_pool),
+                "to": _relationship_node(to_node, node_pool),
                 "relationship": {
                     "property": trans_properties["date"],
                     "link": trans_properties["link"],
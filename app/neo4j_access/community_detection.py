@@ -106,10 +106,10 @@ class CommunityDetection:
 
         query = f"""
         MATCH (n)
-        WHERE (n:Account OR n:NFT) AND id(n) IN {node_ids}
+        WHERE (n:Account OR n:NFT) AND id(n) IN $node_ids
         RETURN id(n) AS node_id, n.{property_name} AS property_value
         """
-        result = self.db.run_query('neo4j',query)
+        result = self.db.run_query('neo4j',query,parameters={"node_ids": node_ids})
         return {record['node_id']: record['property_value'] for record in result}  
       
     def update_node_properties(self, node_updates, property_name):
@@ -293,10 +293,10 @@ class CommunityDetection:
         array_property[scope] = idList
         query_set = f"""
         MATCH (n:Community_Info)
-        SET n.{self.get_processed_collection_name(collection_name)}_id_list = '{json.dumps(array_property)}'
+        SET n.{self.get_processed_collection_name(collection_name)}_id_list = $id_list
         SET n.{self.get_processed_collection_name(collection_name)}_updated_at = timestamp()
         """
-        self.db.run_query('neo4j',query_set )
+        self.db.run_query('neo4j',query_set,parameters={"id_list": json.dumps(array_property)})
 
 
     def update_community_detection(self,limit,collection_name):
@@ -325,8 +325,8 @@ class CommunityDetection:
         ORDER BY size(nodes) DESC
         """
         if limit!=0:
-            com_query+=f" LIMIT {limit}"  
-        community_result = self.db.run_query('neo4j', com_query)
+            com_query+=" LIMIT $limit"  
+        community_result = self.db.run_query('neo4j', com_query, {"limit": limit})
         communities=[]
         community_id=[]
         for record  in community_result:
@@ -351,8 +351,8 @@ class CommunityDetection:
         ORDER BY size(nodes) DESC
         """
         if limit!=0:
-            com_query+=f" LIMIT {limit}"  
-        community_result = self.db.run_query('neo4j', com_query)
+            com_query+=" LIMIT $limit"  
+        community_result = self.db.run_query('neo4j', com_query, {"limit": limit})
         communities=[]
         community_id=[]
         for record  in community_result:
@@ -377,9 +377,9 @@ class CommunityDetection:
         ORDER BY size(nodes) DESC
         """
         if limit!=0:
-            com_query+=f" LIMIT {limit}" 
+            com_query+=" LIMIT $limit" 
         # print("Doing on the third one...")  
-        community_result = self.db.run_query('neo4j', com_query)
+        community_result = self.db.run_query('neo4j', com_query, {"limit": limit})
         communities=[]
         community_id=[]
         for record  in community_result:
@@ -331,10 +331,10 @@ class CommunityLogic:
         # query to get the overall amount of nodes in the community
         node_count = f"""
         MATCH (n) 
-        WHERE (n:Account OR n:NFT) AND n.{collection_processed}_com_id_list[{scope_processed}] = {community_id} 
+        WHERE (n:Account OR n:NFT) AND n.{collection_processed}_com_id_list[$scope] = $community_id 
         RETURN count(n) AS nodeCount
         """
-        node_count_result = db.run_query('neo4j', node_count)
+        node_count_result = db.run_query('neo4j', node_count, {"scope": scope_processed, "community_id": community_id})
         total_node_count = node_count_result[0]["nodeCount"]
         
         # if the community doesn't exist, the exception is raised as otherwise the graph projection would fail and cause an error
@@ -1,8 +1,312 @@
 import logging
+from functools import lru_cache, wraps
 from app.db import get_db
 from typing import List
 import numpy as np
-from app.neo4j_access.utilities import Utilities
+from app.neo4j_access.utilities import Utilities, MonthCache
+
+# Utilities is stateless, a single instance is shared by all requests
+_utilities = Utilities()
+
+# used for the months without any relationship
+_EMPTY_COUNTS = np.empty(0, dtype=np.int32)
+
+# The count arrays are shared between the GINI and Nakamoto endpoints, which are usually requested together
+# by the dashboard for the same collection and time frame. They are cached per (collection, time frame) so
+# both coefficients are calculated from a single query. The cached arrays are read-only, as they are shared.
+
+# Most owners share the same small counts (e.g. a single transaction), therefore the queries don't return 
+# one row per owner but every distinct amount together with the number of owners having that amount. 
+# The counts array for the calculations is expanded from this distribution with np.repeat.
+# The queries don't sort, the distinct amounts are sorted in NumPy before they are expanded. Sorting the 
+# few distinct amounts is cheaper than letting Neo4j sort the result or sorting the expanded array.
+
+# (amount, number of owners) pairs of the streamed query result
+_DISTRIBUTION_DTYPE = np.dtype([('amount', np.int32), ('owners', np.int64)])
+
+def _to_counts_array(query_result):
+    """
+    Turns the streamed query result (distinct amounts with the number of owners) into a read-only NumPy array of 
+    the counts per owner (ordered in ascending order).
+    """
+
+    # The records are consumed one at a time into a structured array, so the result is never held as a list.
+    # The counts per owner are small non-negative integers, int32 halves the memory compared to the default int64
+    distribution = np.fromiter(((record['amount'], record['owners']) for record in query_result), dtype=_DISTRIBUTION_DTYPE)
+    distribution.sort(order='amount')
+    counts_array = np.repeat(distribution['amount'], distribution['owners'])
+    counts_array.flags.writeable = False
+
+    return counts_array
+
+# Query: count the number of transactions for each owner in the time period 
+# If both collections are considered $collection is null and the collection filter is skipped
+# All values are passed as parameters, so Neo4j can reuse the cached query plan. The time frame is 
+# compared as a range of unix timestamps, which doesn't require a datetime conversion for every relationship
+# The relationships are grouped by the address, as there can be several Account nodes with the same address
+_TRANSACTION_COUNT_QUERY = """
+    MATCH (a:Account)-[r:TRANSACTED]->()
+    WHERE ($collection IS NULL OR r.collection_name = $collection)
+        AND r.transaction_timestamp >= $ts_from AND r.transaction_timestamp < $ts_to
+    WITH a.address AS owner, COUNT(r) AS amount
+    RETURN amount, COUNT(owner) AS owners
+"""
+
+@lru_cache(maxsize=256)
+def _transaction_counts(collection_processed: str, year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Returns the number of transactions for each owner in the time period, ordered in ascending order.
+    The result is empty in case there are no transactions in the time period.
+
+    Parameters:
+    - collection_processed: str
+        collection as it is stored in the database or "all" in case both collections are considered
+    - year_from, year_to, month_from, month_to: int
+        the time period
+    """
+
+    db = get_db()
+
+    ts_from, ts_to = _utilities.get_timestamp_range(year_from, year_to, month_from, month_to)
+    parameters = {
+        "collection": _utilities.get_collection_parameter(collection_processed),
+        "ts_from": ts_from,
+        "ts_to": ts_to
+    }
+    query_result = db.run_query_stream('neo4j', _TRANSACTION_COUNT_QUERY, parameters)
+
+    return _to_counts_array(query_result)
+
+# Query: count the number of mint events for each owner in the time period 
+# If both collections are considered $collection is null and the collection filter is skipped
+# All values are passed as parameters, so Neo4j can reuse the cached query plan. The time frame is 
+# compared as a range of unix timestamps, which doesn't require a datetime conversion for every relationship
+# The relationships are grouped by the address, as there can be several Account nodes with the same address
+_MINT_COUNT_QUERY = """
+    MATCH (a:Account)-[r:MINT]->(n:NFT)
+    WHERE ($collection IS NULL OR n.collection_name = $collection)
+        AND r.date >= $ts_from AND r.date < $ts_to
+    WITH a.address AS owner, COUNT(r) AS amount
+    RETURN amount, COUNT(owner) AS owners
+"""
+
+@lru_cache(maxsize=256)
+def _mint_counts(collection_processed: str, year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Returns the number of mint events for each owner in the time period, ordered in ascending order.
+    The result is empty in case there are no mint events in the time period.
+
+    Parameters:
+    - collection_processed: str
+        collection as it is stored in the database or "all" in case both collections are considered
+    - year_from, year_to, month_from, month_to: int
+        the time period
+    """
+
+    db = get_db()
+
+    ts_from, ts_to = _utilities.get_timestamp_range(year_from, year_to, month_from, month_to)
+    parameters = {
+        "collection": _utilities.get_collection_parameter(collection_processed),
+        "ts_from": ts_from,
+        "ts_to": ts_to
+    }
+    query_result = db.run_query_stream('neo4j', _MINT_COUNT_QUERY, parameters)
+
+    return _to_counts_array(query_result)
+
+def _month_ranges(year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Returns every month of the time frame together with its range of unix timestamps.
+    """
+
+    months = []
+    for current_year, current_month in _utilities.get_months(year_from, year_to, month_from, month_to):
+        ts_from, ts_to = _utilities.get_timestamp_range(current_year, current_year, current_month, current_month)
+        months.append({"year": current_year, "month": current_month, "ts_from": ts_from, "ts_to": ts_to})
+
+    return months
+
+# maximum number of months cached per monthly count loader
+COUNTS_CACHE_MONTHS = 512
+
+def _cached_per_month(load_counts_by_month):
+    """
+    Caches the result of a monthly count loader per (collection, year, month) instead of per time frame.
+    Overlapping time frames therefore reuse the months which were already loaded and only the missing 
+    months are queried. The counts of a month only change when new data is inserted, in which case the 
+    cache is cleared with clear_count_cache(), so no expiry is needed. The cache is bounded and locked (MonthCache).
+    """
+
+    cached_months = MonthCache(COUNTS_CACHE_MONTHS)
+
+    @wraps(load_counts_by_month)
+    def counts_by_month(collection_processed: str, year_from: int, year_to: int, month_from: int, month_to: int):
+
+        # load all months between the first and the last missing month with a single query
+        def load_months(first, last):
+            (first_year, first_month), (last_year, last_month) = first, last
+            return load_counts_by_month(collection_processed, first_year, last_year, first_month, last_month)
+
+        months = _utilities.get_months(year_from, year_to, month_from, month_to)
+        return cached_months.get_months(collection_processed, months, load_months, _EMPTY_COUNTS)
+
+    counts_by_month.cache_clear = cached_months.clear
+
+    return counts_by_month
+
+def _to_counts_by_month(query_result):
+    """
+    Turns the streamed query result with one row per month (distinct amounts with the number of owners) into 
+    a dictionary {(year, month): counts array}.
+    Months without any relationship are not included.
+    """
+
+    counts_by_month = {}
+    for record in query_result:
+        amounts = record['amounts']
+        # np.fromiter with a known count allocates the array once and fills it directly
+        amounts_array = np.fromiter(amounts, dtype=np.int32, count=len(amounts))
+        owners_array = np.fromiter(record['owners'], dtype=np.int64, count=len(amounts))
+        order = np.argsort(amounts_array)
+        counts_array = np.repeat(amounts_array[order], owners_array[order])
+        counts_array.flags.writeable = False
+        counts_by_month[(record['year'], record['month'])] = counts_array
+
+    return counts_by_month
+
+# Query: count the number of transactions for each owner and month in the time period and 
+# collect the counts of each month
+# the year and month are stored on the relationship at ingest, only relationships without them are converted
+_TRANSACTION_COUNT_BY_MONTH_QUERY = """
+    MATCH (a:Account)-[r:TRANSACTED]->()
+    WHERE ($collection IS NULL OR r.collection_name = $collection)
+        AND r.transaction_timestamp >= $ts_from AND r.transaction_timestamp < $ts_to
+    WITH a.address AS owner,
+        CASE WHEN r.year IS NULL THEN datetime({epochSeconds: r.transaction_timestamp}).year ELSE r.year END AS year,
+        CASE WHEN r.month IS NULL THEN datetime({epochSeconds: r.transaction_timestamp}).month ELSE r.month END AS month,
+        COUNT(r) AS amount
+    WITH year, month, amount, COUNT(owner) AS owners
+    RETURN year, month, collect(amount) AS amounts, collect(owners) AS owners
+"""
+
+@_cached_per_month
+def _transaction_counts_by_month(collection_processed: str, year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Returns the number of transactions for each owner, for every month of the time period, ordered in ascending order.
+    All months are retrieved with a single query.
+
+    Parameters:
+    - collection_processed: str
+        collection as it is stored in the database or "all" in case both collections are considered
+    - year_from, year_to, month_from, month_to: int
+        the time period
+    """
+
+    db = get_db()
+
+    ts_from, ts_to = _utilities.get_timestamp_range(year_from, year_to, month_from, month_to)
+    parameters = {
+        "collection": _utilities.get_collection_parameter(collection_processed),
+        "ts_from": ts_from,
+        "ts_to": ts_to
+    }
+    query_result = db.run_query_stream('neo4j', _TRANSACTION_COUNT_BY_MONTH_QUERY, parameters)
+
+    return _to_counts_by_month(query_result)
+
+# Query: count the number of mint events for each owner and month in the time period and 
+# collect the counts of each month
+# the year and month are stored on the relationship at ingest, only relationships without them are converted
+_MINT_COUNT_BY_MONTH_QUERY = """
+    MATCH (a:Account)-[r:MINT]->(n:NFT)
+    WHERE ($collection IS NULL OR n.collection_name = $collection)
+        AND r.date >= $ts_from AND r.date < $ts_to
+    WITH a.address AS owner,
+        CASE WHEN r.year IS NULL THEN datetime({epochSeconds: r.date}).year ELSE r.year END AS year,
+        CASE WHEN r.month IS NULL THEN datetime({epochSeconds: r.date}).month ELSE r.month END AS month,
+        COUNT(r) AS amount
+    WITH year, month, amount, COUNT(owner) AS owners
+    RETURN year, month, collect(amount) AS amounts, collect(owners) AS owners
+"""
+
+@_cached_per_month
+def _mint_counts_by_month(collection_processed: str, year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Returns the number of mint events for each owner, for every month of the time period, ordered in ascending order.
+    All months are retrieved with a single query.
+
+    Parameters:
+    - collection_processed: str
+        collection as it is stored in the database or "all" in case both collections are considered
+    - year_from, year_to, month_from, month_to: int
+        the time period
+    """
+
+    db = get_db()
+
+    ts_from, ts_to = _utilities.get_timestamp_range(year_from, year_to, month_from, month_to)
+    parameters = {
+        "collection": _utilities.get_collection_parameter(collection_processed),
+        "ts_from": ts_from,
+        "ts_to": ts_to
+    }
+    query_result = db.run_query_stream('neo4j', _MINT_COUNT_BY_MONTH_QUERY, parameters)
+
+    return _to_counts_by_month(query_result)
+
+# An ownership can be active in several months, therefore the months are passed as a list and the 
+# relationships are matched for each of them within the same query.
+# the relationship needs to start before the end of the month and last at least until the start of the month
+_OWNERSHIP_COUNT_BY_MONTH_QUERY = """
+    UNWIND $months AS m
+    MATCH (a:Account)-[r:OWNED]->(n:NFT)
+    WHERE ($collection IS NULL OR n.collection_name = $collection)
+        AND r.from < m.ts_to
+        AND r.until IS NOT NULL
+        AND (r.currently_owned = true 
+            OR (r.currently_owned = false AND r.until >= m.ts_from))
+    WITH m.year AS year, m.month AS month, a.address AS owner, COUNT(r) AS amount
+    WITH year, month, amount, COUNT(owner) AS owners
+    RETURN year, month, collect(amount) AS amounts, collect(owners) AS owners
+"""
+
+@_cached_per_month
+def _ownership_counts_by_month(collection_processed: str, year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Returns the number of active OWNED relationships for each owner, for every month of the time period, 
+    ordered in ascending order. All months are retrieved with a single query.
+    For an OWNED relationtion to be considered, it needs to be active in the considered month.
+    Thats the case if the ownership started in that month or before and lasted at least until 
+    this month or is still active.
+
+    Parameters:
+    - collection_processed: str
+        collection as it is stored in the database or "all" in case both collections are considered
+    - year_from, year_to, month_from, month_to: int
+        the time period
+    """
+
+    db = get_db()
+
+    parameters = {
+        "collection": _utilities.get_collection_parameter(collection_processed),
+        "months": _month_ranges(year_from, year_to, month_from, month_to)
+    }
+    query_result = db.run_query_stream('neo4j', _OWNERSHIP_COUNT_BY_MONTH_QUERY, parameters)
+
+    return _to_counts_by_month(query_result)
+
+def clear_count_cache():
+    """
+    Clears the cached count arrays. Needs to be called whenever new data is inserted into the database.
+    """
+
+    _transaction_counts.cache_clear()
+    _mint_counts.cache_clear()
+    _transaction_counts_by_month.cache_clear()
+    _mint_counts_by_month.cache_clear()
+    _ownership_counts_by_month.cache_clear()
 
 class EqualityMeasurements:
 
@@ -53,10 +357,20 @@ class EqualityMeasurements:
         n = len(counts_array)
 
         # Calculate the Gini coefficient
-        # This step takes some time 
+        # As the counts are sorted, the sum of all absolute differences |x_i - x_j| equals 
+        # 2 * sum((2i - n - 1) * x_i), which avoids building the n x n difference matrix.
+        # The sums are accumulated as int64 and only the final division is done in float64.
+        # The coefficients are built in place and np.dot fuses the multiplication with the reduction,
+        # so no temporary arrays are created for the intermediate steps
         # adding 0.0000001 to the denominator makes sure that it not devides by 0
-        gini_numerator = np.sum(np.abs(counts_array[:, None] - counts_array))
-        gini_denominator = 2 * n**2 * np.mean(counts_array) + 0.0000001
+        coefficients = np.arange(1, n + 1, dtype=np.int64)
+        coefficients *= 2
+        coefficients -= n + 1
+        total = np.sum(counts_array, dtype=np.int64)
+        weighted_sum = np.dot(coefficients, counts_array)
+
+        gini_numerator = 2 * float(weighted_sum)
+        gini_denominator = 2 * n * float(total) + 0.0000001
     
         gini = gini_numerator / gini_denominator
         
@@ -83,77 +397,19 @@ class EqualityMeasurements:
         Returns:
             float: Gini coefficient (rounded for 4 decimals)
         """
-         
-        db = get_db()
-        utilities = Utilities()
-
-        collection_processed = utilities.get_collection(collection)
-
-        # Query: count the number of transactions for each owner in the time period 
-        # If both collections are considered the collection filter is removed
-        if collection_processed == "all":
-            transaction_count_query = f"""
-            MATCH (a:Account)-[r:TRANSACTED]->()
-            WHERE r.transaction_timestamp IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH a.address AS owner, COUNT(r) AS amount
-            RETURN amount
-            ORDER BY amount ASC
-            """ 
-        else:
-            transaction_count_query = f"""
-            MATCH (a:Account)-[r:TRANSACTED]->()
-            WHERE r.collection_name = "{collection_processed}"
-                AND r.transaction_timestamp IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH a.address AS owner, COUNT(r) AS amount
-            RETURN amount
-            ORDER BY amount ASC
-            """
-
-        query_result = db.run_query('neo4j', transaction_count_query)
+
+        collection_processed = _utilities.get_collection(collection)
+
+        transaction_counts_array = _transaction_counts(collection_processed, year_from, year_to, month_from, month_to)
 
         # in case the query result is empty, return a GINI of -1.0
-        if query_result == []:
+        if transaction_counts_array.size == 0:
             return -1.0
 
-        # Extract the transaction counts into a list
-        transaction_counts = [record['amount'] for record in query_result]
-        # Convert the list into a NumPy array
-        transaction_counts_array = np.array(transaction_counts)
-
         gini = self.gini_coefficient(transaction_counts_array)
     
         return round(gini, 4)
-
+    
     def get_gini_mint(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
          
         """
@@ -176,188 +432,81 @@ class EqualityMeasurements:
             float: Gini coefficient (rounded for 4 decimals)
         """
 
-        db = get_db()
-        utilities = Utilities()
-
-        collection_processed = utilities.get_collection(collection)
-
-        # Query: count the number of transactions for each owner in the time period 
-        # If both collections are considered the collection filter is removed
-        if collection_processed == "all":
-            mint_count_query = f"""
-            MATCH (a:Account)-[r:MINT]->()
-            WHERE r.date IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH a.address AS owner, COUNT(r) AS amount
-            RETURN amount
-            ORDER BY amount ASC
-            """ 
-        else:
-            mint_count_query = f"""
-            MATCH (a:Account)-[r:MINT]->(n)
-            WHERE n.collection_name = "{collection_processed}" 
-                AND r.date IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH a.address AS owner, COUNT(r) AS amount
-            RETURN amount
-            ORDER BY amount ASC
-            """
-
-        query_result = db.run_query('neo4j', mint_count_query)
+        collection_processed = _utilities.get_collection(collection)
+
+        mint_counts_array = _mint_counts(collection_processed, year_from, year_to, month_from, month_to)
 
         # in case the query result is empty, return a GINI of -1.0
-        if query_result == []:
+        if mint_counts_array.size == 0:
             return -1.0
 
-        # Extract the transaction counts into a list
-        mint_counts = [record['amount'] for record in query_result]
-        # Convert the list into a NumPy array
-        mint_counts_array = np.array(mint_counts)
-
         gini = self.gini_coefficient(mint_counts_array)
     
         return round(gini, 4)
     
-    def get_gini_ownership_history(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
+    def _coefficient_history(self, load_counts_by_month, coefficient, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
 
         """
-        This method returns the GINI coefficient based on OWNED relationship for the given time period on a monthly basis. 
-        The Gini coefficient for this relationship gives a measure of inequality in NFT ownership.
-        It is only possible on a monthly basis and not overall as we're only considering active ownerships and 
-        cannot simply count all ownership relationships as they would include the inactive ones as well. 
-        A more granular time frame (like weekly or daily) would be possible as well. It would increase accuracy but 
-        also complexity as more GINI coefficients would need to be calculated.
-        The result is meant to be plotted as a bar-chart in the frontend.
+        Shared implementation of the history methods. Calculates the coefficient for every month of the time period 
+        from the counts returned by the given loader.
 
         Parameter:
-        - year_from: int
-            The start year for the time period
-        - year_to: int
-            The end year for the time period.
-        - month_from: int 
-            The start month for the time period.
-        - month_to: int 
-            The end month for the time period
+        - load_counts_by_month: function
+            one of the monthly count loaders, returns a dictionary {(year, month): counts array}
+        - coefficient: function
+            gini_coefficient or nakamoto_coefficient
+        - year_from, year_to, month_from, month_to: int
+            the time period
         - Collection: List[str]
             list of collections to which the considered NFTs belong to 
 
         Returns 
-            two arrays, one for dates in the format Year-Month, and one for the respective GINI coefficient for that date
+            two arrays, one for dates in the format Year-Month, and one for the respective coefficient for that date
         """
 
-        db = get_db()
-        utilities = Utilities()
+        collection_processed = _utilities.get_collection(collection)
 
-        collection_processed = utilities.get_collection(collection)
-
-        current_year = year_from
-        current_month = month_from
+        # the counts of all months are retrieved with a single query
+        counts_by_month = load_counts_by_month(collection_processed, year_from, year_to, month_from, month_to)
 
         dates = []
-        gini_scores = []
+        scores = []
 
-        # iterate of each month in the specified time frame and calculate a GINI score considering the 
+        # iterate of each month in the specified time frame and calculate a score considering the 
         # relationships of that month
-        # For an OWNED relationtion to be considered, it needs to be active in the considered month.
-        # Thats the case if the ownership started in that month or before and lasted at least until 
-        # this month or is still active. This is made sure by the query below 
-        while (current_year < year_to) or (current_year == year_to and current_month <= month_to):
-
-            # queries consider transactions only of the considered month.
-            # if only one collection is considered, a collection filter is included
-            if collection_processed == "all":
-                ownership_count_query = f"""
-                MATCH (a)-[r:OWNED]->(n)
-                WHERE r.from IS NOT NULL
-                    AND r.until IS NOT NULL
-                    AND (datetime({{epochSeconds: r.from}}).year < {current_year} 
-                        OR (datetime({{epochSeconds: r.from}}).year = {current_year}  AND datetime({{epochSeconds: r.from}}).month <= {current_month}))
-                    AND (r.currently_owned = true 
-                        OR (r.currently_owned = false AND (datetime({{epochSeconds: r.until}}).year > {current_year}  
-                        OR (datetime({{epochSeconds: r.until}}).year = {current_year}  AND datetime({{epochSeconds: r.from}}).month >= {current_month}))))
-                WITH a.address AS owner, COUNT(r) AS amount
-                RETURN amount
-                ORDER BY amount ASC
-                """
-            else:
-                ownership_count_query = f"""
-                MATCH (a)-[r:OWNED]->(n)
-                WHERE n.collection_name = "{collection_processed}"
-                    AND r.from IS NOT NULL
-                    AND r.until IS NOT NULL
-                    AND (datetime({{epochSeconds: r.from}}).year < {current_year} 
-                        OR (datetime({{epochSeconds: r.from}}).year = {current_year}  AND datetime({{epochSeconds: r.from}}).month <= {current_month}))
-                    AND (r.currently_owned = true 
-                        OR (r.currently_owned = false AND (datetime({{epochSeconds: r.until}}).year > {current_year}  
-                        OR (datetime({{epochSeconds: r.until}}).year = {current_year}  AND datetime({{epochSeconds: r.from}}).month >= {current_month}))))
-                WITH a.address AS owner, COUNT(r) AS amount
-                RETURN amount
-                ORDER BY amount ASC
-                """
-            query_result = db.run_query('neo4j', ownership_count_query)
-            date = str(current_year) + "," + str(current_month)
+        for current_year, current_month in _utilities.get_months(year_from, year_to, month_from, month_to):
 
-            if query_result != []:               
-                # Extract the transaction counts into a list
-                mint_counts = [record['amount'] for record in query_result]
-                # Convert the list into a NumPy array
-                mint_counts_array = np.array(mint_counts)
+            counts_array = counts_by_month.get((current_year, current_month), _EMPTY_COUNTS)
+            date = str(current_year) + "," + str(current_month)
 
-                gini = self.gini_coefficient(mint_counts_array)
+            if counts_array.size != 0:
+                score = coefficient(counts_array)
 
                 dates.append(date)
-                gini_scores.append(round(gini, 4))
-
-                logging.info(f"gini coef. calculated for year {current_year} and month {current_month}")
+                scores.append(score)
             else:
                 dates.append(date)
-                gini_scores.append(-1.0)
+                scores.append(-1.0)
 
-            if current_month == 12:
-                current_month = 1
-                current_year += 1
-            else:
-                current_month += 1
+        # a single summary instead of one log entry per month
+        logging.info("%s calculated for %d months from %d,%d to %d,%d", 
+                     coefficient.__name__, len(dates), year_from, month_from, year_to, month_to)
 
+        # round all scores for 4 decimals at once
         final_result = {
             "dates": dates,
-            "counts": gini_scores
+            "counts": np.round(scores, 4).tolist()
         }
     
         return final_result
-    
-    def get_gini_transaction_history(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
+
+    def get_gini_ownership_history(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
 
         """
-        This method returns the GINI coefficient based on TRANSACTED relationship for the given time period on a monthly basis. 
+        This method returns the GINI coefficient based on OWNED relationship for the given time period on a monthly basis. 
+        The Gini coefficient for this relationship gives a measure of inequality in NFT ownership.
+        It is only possible on a monthly basis and not overall as we're only considering active ownerships and 
+        cannot simply count all ownership relationships as they would include the inactive ones as well. 
         A more granular time frame (like weekly or daily) would be possible as well. It would increase accuracy but 
         also complexity as more GINI coefficients would need to be calculated.
         The result is meant to be plotted as a bar-chart in the frontend.
@@ -378,75 +527,33 @@ class EqualityMeasurements:
             two arrays, one for dates in the format Year-Month, and one for the respective GINI coefficient for that date
         """
 
-        db = get_db()
-        utilities = Utilities()
-
-        collection_processed = utilities.get_collection(collection)
-
-        current_year = year_from
-        current_month = month_from
-
-        dates = []
-        gini_scores = []
-
-        # iterate of each month in the specified time frame and calculate a GINI score considering the 
-        # relationships of that month
-        while (current_year < year_to) or (current_year == year_to and current_month <= month_to):
-
-            # queries consider transactions only of the considered month.
-            # if only one collection is considered, a collection filter is included
-            if collection_processed == "all":
-                transaction_count_query = f"""
-                MATCH (a:Account)-[r:TRANSACTED]->()
-                WHERE r.transaction_timestamp IS NOT NULL 
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {current_year} 
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month = {current_month} 
-                WITH a.address AS owner, COUNT(r) AS amount
-                RETURN amount
-                ORDER BY amount ASC
-                """ 
-            else:
-                transaction_count_query = f"""
-                MATCH (a:Account)-[r:TRANSACTED]->()
-                WHERE r.collection_name = "{collection_processed}"
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {current_year} 
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month = {current_month} 
-                WITH a.address AS owner, COUNT(r) AS amount
-                RETURN amount
-                ORDER BY amount ASC
-                """
-
-            query_result = db.run_query('neo4j', transaction_count_query)
-            date = str(current_year) + "," + str(current_month)
-
-            if query_result != []:               
-                # Extract the transaction counts into a list
-                mint_counts = [record['amount'] for record in query_result]
-                # Convert the list into a NumPy array
-                mint_counts_array = np.array(mint_counts)
-
-                gini = self.gini_coefficient(mint_counts_array)
+        return self._coefficient_history(_ownership_counts_by_month, self.gini_coefficient, collection, year_from, year_to, month_from, month_to)
+    
+    def get_gini_transaction_history(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
 
-                dates.append(date)
-                gini_scores.append(round(gini, 4))
+        """
+        This method returns the GINI coefficient based on TRANSACTED relationship for the given time period on a monthly basis. 
+        A more granular time frame (like weekly or daily) would be possible as well. It would increase accuracy but 
+        also complexity as more GINI coefficients would need to be calculated.
+        The result is meant to be plotted as a bar-chart in the frontend.
 
-                logging.info(f"gini coef. calculated for year {current_year} and month {current_month}")
-            else:
-                dates.append(date)
-                gini_scores.append(-1.0)
+        Parameter:
+        - year_from: int
+            The start year for the time period
+        - year_to: int
+            The end year for the time period.
+        - month_from: int 
+            The start month for the time period.
+        - month_to: int 
+            The end month for the time period
+        - Collection: List[str]
+            list of collections to which the considered NFTs belong to 
 
-            if current_month == 12:
-                current_month = 1
-                current_year += 1
-            else:
-                current_month += 1
+        Returns 
+            two arrays, one for dates in the format Year-Month, and one for the respective GINI coefficient for that date
+        """
 
-        final_result = {
-            "dates": dates,
-            "counts": gini_scores
-        }
-    
-        return final_result
+        return self._coefficient_history(_transaction_counts_by_month, self.gini_coefficient, collection, year_from, year_to, month_from, month_to)
     
     def get_gini_mint_history(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
 
@@ -472,76 +579,7 @@ class EqualityMeasurements:
             two arrays, one for dates in the format Year-Month, and one for the respective GINI coefficient for that date
         """
 
-        db = get_db()
-        utilities = Utilities()
-
-        collection_processed = utilities.get_collection(collection)
-
-        current_year = year_from
-        current_month = month_from
-
-        dates = []
-        gini_scores = []
-
-        # iterate of each month in the specified time frame and calculate a GINI score considering the 
-        # relationships of that month
-        while (current_year < year_to) or (current_year == year_to and current_month <= month_to):
-            
-            # queries consider mint events only of the considered month.
-            # if only one collection is considered, a collection filter is included
-            if collection_processed == "all":
-                mint_count_query = f"""
-                MATCH (a:Account)-[r:MINT]->()
-                WHERE r.date IS NOT NULL 
-                    AND datetime({{epochSeconds: r.date}}).year = {current_year}
-                    AND datetime({{epochSeconds: r.date}}).month = {current_month} 
-                WITH a.address AS owner, COUNT(r) AS amount
-                RETURN amount
-                ORDER BY amount ASC
-                """ 
-            else:
-                mint_count_query = f"""
-                MATCH (a:Account)-[r:MINT]->(n)
-                WHERE n.collection_name = "{collection_processed}" 
-                    AND r.date IS NOT NULL 
-                    AND datetime({{epochSeconds: r.date}}).year = {current_year}
-                    AND datetime({{epochSeconds: r.date}}).month = {current_month} 
-                WITH a.address AS owner, COUNT(r) AS amount
-                RETURN amount
-                ORDER BY amount ASC
-                """
-
-            query_result = db.run_query('neo4j', mint_count_query)
-            date = str(current_year) + "," + str(current_month)
-
-            if query_result != []:               
-                # Extract the transaction counts into a list
-                mint_counts = [record['amount'] for record in query_result]
-                # Convert the list into a NumPy array
-                mint_counts_array = np.array(mint_counts)
-
-                gini = self.gini_coefficient(mint_counts_array)
-
-                dates.append(date)
-                gini_scores.append(round(gini, 4))
-
-                logging.info(f"gini coef. calculated for year {current_year} and month {current_month}")
-            else:
-                dates.append(date)
-                gini_scores.append(-1.0)
-
-            if current_month == 12:
-                current_month = 1
-                current_year += 1
-            else:
-                current_month += 1
-
-        final_result = {
-            "dates": dates,
-            "counts": gini_scores
-        }
-    
-        return final_result
+        return self._coefficient_history(_mint_counts_by_month, self.gini_coefficient, collection, year_from, year_to, month_from, month_to)
     
     def nakamoto_coefficient(self, counts_array):
         """
@@ -549,20 +587,26 @@ class EqualityMeasurements:
         to control more than 50% of a resource, reflecting resource decentralization.
     
         Args:
-        counts_array (List[int]): Counts of resource control by each entity.
+        counts_array (List[int]): Counts of resource control by each entity. Ordered in ascending order
     
         Returns:
         int: Nakamoto coefficient.
         """
 
-        sorted_counts = np.sort(counts_array)[::-1]
-        total = np.sum(sorted_counts)
+        if counts_array.size == 0:
+            return 0
+
+        # the counts are already sorted ascending, so the reversed view gives the biggest entities first
+        # without copying the array. The cumulative sum is monotone, so the first entity exceeding 50%
+        # can be found with a binary search. Its last element is the total, which saves a separate pass
+        # The counts are int32, the running total is accumulated as int64 so it cannot overflow
+        cumulative_sum = np.cumsum(counts_array[::-1], dtype=np.int64)
+        total = cumulative_sum[-1]
 
         if total == 0:  # Prevent division by zero and meaningless calculations
             return 0
 
-        cumulative_sum = np.cumsum(sorted_counts)
-        nakamoto = np.argmax(cumulative_sum > 0.5 * total) + 1
+        nakamoto = np.searchsorted(cumulative_sum, 0.5 * total, side='right') + 1
 
         return int(nakamoto)
     
@@ -587,75 +631,17 @@ class EqualityMeasurements:
         Returns:
             float: Nakamoto coefficient (rounded for 4 decimals)
         """
-            
-        db = get_db()
-        utilities = Utilities()
-    
-        collection_processed = utilities.get_collection(collection)
-    
-        # Query: count the number of transactions for each owner in the time period 
-        # If both collections are considered the collection filter is removed
-        if collection_processed == "all":
-            transaction_count_query = f"""
-            MATCH (a:Account)-[r:TRANSACTED]->()
-            WHERE r.transaction_timestamp IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH a.address AS owner, COUNT(r) AS amount
-            RETURN amount
-            ORDER BY amount ASC
-            """ 
-        else:
-            transaction_count_query = f"""
-            MATCH (a:Account)-[r:TRANSACTED]->()
-            WHERE r.collection_name = "{collection_processed}"
-                AND r.transaction_timestamp IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH a.address AS owner, COUNT(r) AS amount
-            RETURN amount
-            ORDER BY amount ASC
-            """
-    
-        query_result = db.run_query('neo4j', transaction_count_query)
+
+        collection_processed = _utilities.get_collection(collection)
+
+        transaction_counts_array = _transaction_counts(collection_processed, year_from, year_to, month_from, month_to)
 
         # in case the query result is empty, return a Nakamoto of -1.0
-        if query_result == []:
+        if transaction_counts_array.size == 0:
             return -1.0
-            
-        # Extract the transaction counts into a list
-        transaction_counts = [record['amount'] for record in query_result]
-        # Convert the list into a NumPy array
-        transaction_counts_array = np.array(transaction_counts)
 
         nakamoto = self.nakamoto_coefficient(transaction_counts_array)
-
+    
         return round(nakamoto, 4)
     
     def get_nakamoto_mint(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
@@ -679,73 +665,17 @@ class EqualityMeasurements:
             Returns:
                 float: Nakamoto coefficient (rounded for 4 decimals)
         """
-        
-        db = get_db()
-        utilities = Utilities()
-        
-        collection_processed = utilities.get_collection(collection)
-        
-        # Query: count the number of transactions for each owner in the time period 
-        # If both collections are considered the collection filter is removed
-        if collection_processed == "all":
-            mint_count_query = f"""
-            MATCH (a:Account)-[r:MINT]->()
-            WHERE r.date IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH a.address AS owner, COUNT(r) AS amount
-            RETURN amount
-            ORDER BY amount ASC
-             """ 
-        else:
-            mint_count_query = f"""
-            MATCH (a:Account)-[r:MINT]->(n)
-            WHERE n.collection_name = "{collection_processed}" 
-            AND r.date IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH a.address AS owner, COUNT(r) AS amount
-            RETURN amount
-            ORDER BY amount ASC
-            """
-            
-        query_result = db.run_query('neo4j', mint_count_query)
+
+        collection_processed = _utilities.get_collection(collection)
+
+        mint_counts_array = _mint_counts(collection_processed, year_from, year_to, month_from, month_to)
 
         # in case the query result is empty, return a Nakamoto of -1.0
-        if query_result == []:
+        if mint_counts_array.size == 0:
             return -1.0
-                
-        # Extract the transaction counts into a list
-        mint_counts = [record['amount'] for record in query_result]
-        # Convert the list into a NumPy array
-        mint_counts_array = np.array(mint_counts)
+
         nakamoto = self.nakamoto_coefficient(mint_counts_array)
+    
         return round(nakamoto, 4)
     
     def get_nakamoto_ownership_history(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
@@ -768,85 +698,8 @@ class EqualityMeasurements:
             Returns 
             two arrays, one for dates in the format Year-Month, and one for the respective Nakamoto coefficient for that date
         """
-            
-        db = get_db()
-        utilities = Utilities()
-            
-        collection_processed = utilities.get_collection(collection)
-            
-        current_year = year_from
-        current_month = month_from
-            
-        dates = []
-        nakamoto_scores = []
-        
-        # iterate of each month in the specified time frame and calculate a Nakamoto score considering the relationships of that month
-        while (current_year < year_to) or (current_year == year_to and current_month <= month_to):
-        
-        # queries consider transactions only of the considered month.
-        # if only one collection is considered, a collection filter is included
-            if collection_processed == "all":
-                ownership_count_query = f"""
-                MATCH (a)-[r:OWNED]->(n)
-                WHERE r.from IS NOT NULL
-                AND r.until IS NOT NULL
-                AND (datetime({{epochSeconds: r.from}}).year < {current_year} 
-                    OR (datetime({{epochSeconds: r.from}}).year = {current_year}  AND datetime({{epochSeconds: r.from}}).month <= {current_month}))
-                AND (r.currently_owned = true
-                    OR (r.currently_owned = false AND (datetime({{epochSeconds: r.until}}).year > {current_year}
-                    OR (datetime({{epochSeconds: r.until}}).year = {current_year}  AND datetime({{epochSeconds: r.from}}).month >= {current_month}))))
-                WITH a.address AS owner, COUNT(r) AS amount
-                RETURN amount
-                ORDER BY amount ASC
-                """
-
-            else:
-                ownership_count_query = f"""
-                MATCH (a)-[r:OWNED]->(n)
-                WHERE n.collection_name = "{collection_processed}"
-                AND r.from IS NOT NULL
-                AND r.until IS NOT NULL
-                AND (datetime({{epochSeconds: r.from}}).year < {current_year} 
-                    OR (datetime({{epochSeconds: r.from}}).year = {current_year}  AND datetime({{epochSeconds: r.from}}).month <= {current_month}))
-                AND (r.currently_owned = true
-                    OR (r.currently_owned = false AND (datetime({{epochSeconds: r.until}}).year > {current_year}  
-                    OR (datetime({{epochSeconds: r.until}}).year = {current_year}  AND datetime({{epochSeconds: r.from}}).month >= {current_month}))))
-                WITH a.address AS owner, COUNT(r) AS amount
-                RETURN amount
-                ORDER BY amount ASC
-                """
-            query_result = db.run_query('neo4j', ownership_count_query)
-            date = str(current_year) + "," + str(current_month)
-
-            if query_result != []:
-                # Extract the transaction counts into a list
-                mint_counts = [record['amount'] for record in query_result]
-                # Convert the list into a NumPy array
-                mint_counts_array = np.array(mint_counts)
 
-                nakamoto = self.nakamoto_coefficient(mint_counts_array)
-
-                dates.append(date)
-                nakamoto_scores.append(round(nakamoto, 4))
-
-                logging.info(f"nakamoto coef. calculated for year {current_year} and month {current_month}")
-
-            else:
-                dates.append(date)
-                nakamoto_scores.append(-1.0)
-
-            if current_month == 12:
-                current_month = 1
-                current_year += 1
-            else:
-                current_month += 1
-
-        final_result = {
-            "dates": dates,
-            "counts": nakamoto_scores
-        }
-
-        return final_result
+        return self._coefficient_history(_ownership_counts_by_month, self.nakamoto_coefficient, collection, year_from, year_to, month_from, month_to)
     
     def get_nakamoto_transaction_history(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
                 
@@ -868,77 +721,8 @@ class EqualityMeasurements:
             Returns 
             two arrays, one for dates in the format Year-Month, and one for the respective Nakamoto coefficient for that date
         """
-                
-        db = get_db()
-        utilities = Utilities()
-                
-        collection_processed = utilities.get_collection(collection)
-                
-        current_year = year_from
-        current_month = month_from
-                
-        dates = []
-        nakamoto_scores = []
-            
-        # iterate of each month in the specified time frame and calculate a Nakamoto score considering the 
-        # relationships of that month
-        while (current_year < year_to) or (current_year == year_to and current_month <= month_to):
-            
-        # queries consider transactions only of the considered month.
-        # if only one collection is considered, a collection filter is included
-            if collection_processed == "all":
-                transaction_count_query = f"""
-                MATCH (a:Account)-[r:TRANSACTED]->()
-                WHERE r.transaction_timestamp IS NOT NULL 
-                AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {current_year} 
-                AND datetime({{epochSeconds: r.transaction_timestamp}}).month = {current_month} 
-                WITH a.address AS owner, COUNT(r) AS amount
-                RETURN amount
-                ORDER BY amount ASC
-                """ 
-            else:
-                transaction_count_query = f"""
-                MATCH (a:Account)-[r:TRANSACTED]->()
-                WHERE r.collection_name = "{collection_processed}"
-                AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {current_year} 
-                AND datetime({{epochSeconds: r.transaction_timestamp}}).month = {current_month}
-                WITH a.address AS owner, COUNT(r) AS amount 
-                RETURN amount
-                ORDER BY amount ASC
-                """
-
-            query_result = db.run_query('neo4j', transaction_count_query)
-            date = str(current_year) + "," + str(current_month)
-
-            if query_result != []:
-                # Extract the transaction counts into a list
-                mint_counts = [record['amount'] for record in query_result]
-                # Convert the list into a NumPy array
-                mint_counts_array = np.array(mint_counts)
-
-                nakamoto = self.nakamoto_coefficient(mint_counts_array)
-
-                dates.append(date)
-                nakamoto_scores.append(round(nakamoto, 4))
-
-                logging.info(f"nakamoto coef. calculated for year {current_year} and month {current_month}")
-
-            else:
-                dates.append(date)
-                nakamoto_scores.append(-1.0)
-
-            if current_month == 12:
-                current_month = 1
-                current_year += 1
-            else:
-                current_month += 1
-
-        final_result = {
-            "dates": dates,
-            "counts": nakamoto_scores
-        }
 
-        return final_result
+        return self._coefficient_history(_transaction_counts_by_month, self.nakamoto_coefficient, collection, year_from, year_to, month_from, month_to)
     
     def get_nakamoto_mint_history(self, collection: List[str], year_from: int, year_to: int, month_from: int, month_to: int):
                     
@@ -960,74 +744,5 @@ class EqualityMeasurements:
         Returns 
         two arrays, one for dates in the format Year-Month, and one for the respective Nakamoto coefficient for that date
         """
-        db = get_db()
-        utilities = Utilities()
-        
-        collection_processed = utilities.get_collection(collection)
-                    
-        current_year = year_from
-        current_month = month_from
-        
-        dates = []
-        nakamoto_scores = []
-                
-        # iterate of each month in the specified time frame and calculate a Nakamoto score considering the 
-        # relationships of that month
-        while (current_year < year_to) or (current_year == year_to and current_month <= month_to):
-                
-            # queries consider mint events only of the considered month.
-            # if only one collection is considered, a collection filter is included
-            if collection_processed == "all":
-                mint_count_query = f"""
-                        MATCH (a:Account)-[r:MINT]->()
-                        WHERE r.date IS NOT NULL 
-                        AND datetime({{epochSeconds: r.date}}).year = {current_year}
-                        AND datetime({{epochSeconds: r.date}}).month = {current_month} 
-                        WITH a.address AS owner, COUNT(r) AS amount
-                        RETURN amount
-                        ORDER BY amount ASC
-                        """ 
-            else:
-                mint_count_query = f"""
-                        MATCH (a:Account)-[r:MINT]->(n)
-                        WHERE n.collection_name = "{collection_processed}" 
-                        AND r.date IS NOT NULL 
-                        AND datetime({{epochSeconds: r.date}}).year = {current_year}
-                        AND datetime({{epochSeconds: r.date}}).month = {current_month}
-                        WITH a.address AS owner, COUNT(r) AS amount
-                        RETURN amount
-                        ORDER BY amount ASC
-                        """
-
-            query_result = db.run_query('neo4j', mint_count_query)
-            date = str(current_year) + "," + str(current_month)
-
-            if query_result != []:
-                # Extract the transaction counts into a list
-                mint_counts = [record['amount'] for record in query_result]
-                # Convert the list into a NumPy array
-                mint_counts_array = np.array(mint_counts)
-
-                nakamoto = self.nakamoto_coefficient(mint_counts_array)
-
-                dates.append(date)
-                nakamoto_scores.append(round(nakamoto, 4))
-
-                logging.info(f"nakamoto coef. calculated for year {current_year} and month {current_month}")
-
-            else:
-                dates.append(date)
-                nakamoto_scores.append(-1.0)
-            
-            if current_month == 12:
-                current_month = 1
-                current_year += 1
-            else:
-                current_month += 1
-
-        final_result = {
-            "dates": dates,
-            "counts": nakamoto_scores
-        }
 
-        return final_result
\ No newline at end of file
+        return self._coefficient_history(_mint_counts_by_month, self.nakamoto_coefficient, collection, year_from, year_to, month_from, month_to)
@@ -1,8 +1,141 @@
 from app.db import get_db
+from functools import lru_cache
 from typing import List, Dict
-from app.neo4j_access.utilities import Utilities
-from datetime import datetime, timedelta
-import calendar
+from app.neo4j_access.utilities import Utilities, MonthCache
+from datetime import date, timedelta
+from collections import Counter
+import numpy as np
+
+# Utilities is stateless, a single instance is shared by all requests
+_utilities = Utilities()
+
+# maximum number of months cached for the daily counts
+DAILY_COUNTS_CACHE_MONTHS = 1024
+
+# The daily counts are materialized per month in memory, keyed by (query, collection, (year, month)).
+# A month is aggregated by Neo4j only once, overlapping time frames reuse the months which were already 
+# loaded and only the missing months are queried. The counts only change when new data is inserted, 
+# therefore they are kept until clear_history_cache() is called (or evicted as least recently used).
+_daily_counts_by_month = MonthCache(DAILY_COUNTS_CACHE_MONTHS)
+
+# maximum number of months cached for the collection distribution
+COLLECTION_COUNTS_CACHE_MONTHS = 512
+
+# The number of events per collection is rolled up per month in the same way, keyed by (query, (year, month))
+_collection_counts_by_month = MonthCache(COLLECTION_COUNTS_CACHE_MONTHS)
+
+# day number 0 (unix timestamp / 86400) is the 1970-01-01
+_EPOCH = date(1970, 1, 1)
+
+@lru_cache(maxsize=256)
+def _day_range(year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Returns the days of the time frame as strings in the format "Year-Month-Day" and the day number 
+    (days since 1970-01-01, as returned by the queries) of the first day. The day range only depends on 
+    the time frame, therefore it's computed once and shared by all histories of the same time frame.
+    """
+
+    # All days of the time frame are created at once as a NumPy datetime64 range. Its integer 
+    # representation is the day number and its string representation the format of the output
+    first_month = np.datetime64(f"{year_from:04d}-{month_from:02d}", 'M')
+    last_month = np.datetime64(f"{year_to:04d}-{month_to:02d}", 'M')
+    days = np.arange(first_month, last_month + 1, dtype='datetime64[D]')
+
+    first_day = int(days[0].astype(np.int64)) if len(days) != 0 else 0
+
+    return tuple(days.astype(str).tolist()), first_day
+
+def _daily_counts(query: str, collection: str, year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Runs one of the daily history queries and returns a dictionary {day number: count} for the time frame.
+    The months which are not yet cached are loaded with a single query.
+
+    Parameters:
+    - query: str
+        history query returning the columns day and number
+    - collection: str
+        value for the $collection parameter, None in case both collections are considered
+    - year_from, year_to, month_from, month_to: int
+        the time frame
+    """
+
+    # load all months between the first and the last missing month, 
+    # the time frame is filtered as a range of unix timestamps
+    def load_months(first, last):
+        db = get_db()
+
+        (first_year, first_month), (last_year, last_month) = first, last
+        ts_from, ts_to = _utilities.get_timestamp_range(first_year, last_year, first_month, last_month)
+        parameters = {
+            "collection": collection,
+            "ts_from": ts_from,
+            "ts_to": ts_to
+        }
+        query_results = db.run_query_stream('neo4j', query, parameters)
+
+        # split the result into the months, the months without any result are cached as empty
+        loaded = {}
+        for result in query_results:
+            day = _EPOCH + timedelta(days=result['day'])
+            loaded.setdefault((day.year, day.month), {})[result['day']] = result['number']
+
+        return loaded
+
+    months = _utilities.get_months(year_from, year_to, month_from, month_to)
+    counts_by_month = _daily_counts_by_month.get_months((query, collection), months, load_months, {})
+
+    # create a dictionary with day and repsective count 
+    date_to_count = {}
+    for month in months:
+        date_to_count.update(counts_by_month[month])
+
+    return date_to_count
+
+def _collection_counts(query: str, year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Runs one of the collection distribution queries and returns a dictionary {collection: count} for the time frame.
+    The months which are not yet cached are loaded with a single query, the cached months are only summed up.
+
+    Parameters:
+    - query: str
+        distribution query returning the columns year, month, collection and number
+    - year_from, year_to, month_from, month_to: int
+        the time frame
+    """
+
+    # load all months between the first and the last missing month
+    def load_months(first, last):
+        db = get_db()
+
+        (first_year, first_month), (last_year, last_month) = first, last
+        ts_from, ts_to = _utilities.get_timestamp_range(first_year, last_year, first_month, last_month)
+        parameters = {"ts_from": ts_from, "ts_to": ts_to}
+        query_results = db.run_query_stream('neo4j', query, parameters)
+
+        # split the result into the months, the months without any result are cached as empty
+        loaded = {}
+        for result in query_results:
+            loaded.setdefault((result['year'], result['month']), {})[result['collection']] = result['number']
+
+        return loaded
+
+    months = _utilities.get_months(year_from, year_to, month_from, month_to)
+    counts_by_month = _collection_counts_by_month.get_months(query, months, load_months, {})
+
+    # sum up the monthly counts of each collection
+    collection_to_count = Counter()
+    for month in months:
+        collection_to_count.update(counts_by_month[month])
+
+    return collection_to_count
+
+def clear_history_cache():
+    """
+    Clears the cached daily counts and collection counts. Needs to be called whenever new data is inserted into the database.
+    """
+
+    _daily_counts_by_month.clear()
+    _collection_counts_by_month.clear()
 
 class HistoryLogic:
 
@@ -23,6 +156,8 @@ class HistoryLogic:
         This method counts the number of users that transacted each day.
     - get_active_users_mint(self, year_from: int, year_to: int, month_from: int, month_to: int, collection: List[str])
         This method counts the number of users that minted and NFT each day.
+    - get_dashboard_history(self, year_from: int, year_to: int, month_from: int, month_to: int, collection: List[str])
+        This method returns all daily histories for the same time frame and collection at once.
 
     Author
     ------
@@ -50,36 +185,25 @@ class HistoryLogic:
         - month_to: int 
             The end month for the time frame
         - date_to_count: Dict
-            query result, including days and counts 
+            query result, including days (as number of days since 1970-01-01) and counts 
         """
 
-        #Define the date range
-        start_date = datetime(year_from, month_from, 1)
-
-        # Calculate end_date as the last day of the month_to
-        last_day_of_month = calendar.monthrange(year_to, month_to)[1]
-        end_date = datetime(year_to, month_to, last_day_of_month)
-
-        dates = []
-        counts = []
-
-        # Iterate through each date in the specified range, to add a count = 0 for the dates that are not included in the 
-        # query result
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = current_date.strftime('%Y-%m-%d')
-            dates.append(date_str)
-            # Check if the date is in the original results
-            if date_str in date_to_count:
-                counts.append(date_to_count[date_str])
-            else:
-                counts.append(0)
-            # Move to the next day
-            current_date += timedelta(days=1)
+        # the days that are not included in the query result get a count = 0
+        dates, first_day = _day_range(year_from, year_to, month_from, month_to)
+
+        # instead of looking up every day in the dictionary, the counts of the query result are written 
+        # at once into an array of zeros, at the position of their day within the time frame
+        counts = np.zeros(len(dates), dtype=np.int64)
+        if len(dates) != 0 and date_to_count:
+            result_days = np.fromiter(date_to_count.keys(), dtype=np.int64, count=len(date_to_count))
+            result_counts = np.fromiter(date_to_count.values(), dtype=np.int64, count=len(date_to_count))
+            positions = result_days - first_day
+            inside = (positions >= 0) & (positions < len(dates))
+            counts[positions[inside]] = result_counts[inside]
 
         final_result = {
-            "dates": dates,
-            "counts": counts
+            "dates": list(dates),
+            "counts": counts.tolist()
         }
 
         return final_result
@@ -104,63 +228,20 @@ class HistoryLogic:
             list of collections for which the relationships are counted 
         """
 
-        db = get_db()
-        utilities = Utilities()
-
-        collection_processed = utilities.get_collection(collection)
-
-        # depending whether both collections are selected or not, the collection filter is added in the query
-        if collection_processed == "all":
-            query = f"""
-            MATCH ()-[r:TRANSACTED]->()
-            WHERE r.transaction_timestamp IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.transaction_timestamp}})) AS transaction_date, COUNT(r) AS transaction_count
-            RETURN transaction_date, transaction_count
-            ORDER BY transaction_date
-            """
-        else:
-            query = f"""
-            MATCH ()-[r:TRANSACTED]->()
-            WHERE r.collection_name = "{collection_processed}"
-            AND r.transaction_timestamp IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.transaction_timestamp}})) AS transaction_date, COUNT(r) AS transaction_count
-            RETURN transaction_date, transaction_count
-            ORDER BY transaction_date
-            """
+        collection_processed = _utilities.get_collection(collection)
+
+        # If both collections are considered $collection is null and the collection filter is skipped.
+        # All values are passed as parameters, so Neo4j can reuse the cached query plan
+        # The relationships are grouped by day number (timestamp / 86400) instead of creating a date for each of them
+        query = """
+        MATCH ()-[r:TRANSACTED]->()
+        WHERE ($collection IS NULL OR r.collection_name = $collection)
+        AND r.transaction_timestamp >= $ts_from AND r.transaction_timestamp < $ts_to
+        WITH toInteger(r.transaction_timestamp / 86400) AS day, COUNT(*) AS number
+        RETURN day, number
+        """
 
-        query_results = db.run_query('neo4j', query)
-        # create a dictionary with date and repsective count 
-        date_to_count = {str(result['transaction_date']): result['transaction_count'] for result in query_results}
+        date_to_count = _daily_counts(query, _utilities.get_collection_parameter(collection_processed), year_from, year_to, month_from, month_to)
 
         final_result = self.create_history_result(year_from, year_to, month_from, month_to, date_to_count)
 
@@ -186,62 +267,20 @@ class HistoryLogic:
             list of collections for which the relationships are counted 
         """
 
-        db = get_db()
-        utilities = Utilities()
-
-        collection_processed = utilities.get_collection(collection)
-
-        # depending whether both collections are selected or not, the collection filter is added in the query
-        if collection_processed == "all":
-            query = f"""
-            MATCH ()-[r:MINT]->()
-            WHERE r.date IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.date}})) AS mint_date, COUNT(r) AS mint_count
-            RETURN mint_date, mint_count
-            ORDER BY mint_date
-            """
-        else:
-            query = f"""
-            MATCH ()-[r:MINT]->(n)
-            WHERE n.collection_name = "{collection_processed}" 
-            AND r.date IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.date}})) AS mint_date, COUNT(r) AS mint_count
-            RETURN mint_date, mint_count
-            ORDER BY mint_date
-            """
+        collection_processed = _utilities.get_collection(collection)
+
+        # If both collections are considered $collection is null and the collection filter is skipped.
+        # All values are passed as parameters, so Neo4j can reuse the cached query plan
+        # The relationships are grouped by day number (timestamp / 86400) instead of creating a date for each of them
+        query = """
+        MATCH ()-[r:MINT]->(n:NFT)
+        WHERE ($collection IS NULL OR n.collection_name = $collection)
+        AND r.date >= $ts_from AND r.date < $ts_to
+        WITH toInteger(r.date / 86400) AS day, COUNT(*) AS number
+        RETURN day, number
+        """
 
-        query_results = db.run_query('neo4j', query)
-        date_to_count = {str(result['mint_date']): result['mint_count'] for result in query_results}
+        date_to_count = _daily_counts(query, _utilities.get_collection_parameter(collection_processed), year_from, year_to, month_from, month_to)
 
         final_result = self.create_history_result(year_from, year_to, month_from, month_to, date_to_count)
 
@@ -267,143 +306,31 @@ class HistoryLogic:
             list of collections in which the users where active in order to be counted as active
         """
 
-        db = get_db()
-        utilities = Utilities()
-
-        collection_processed = utilities.get_collection(collection)
+        collection_processed = _utilities.get_collection(collection)
 
-        # depending whether both collections are selected or not, the collection filter is added in the query
-        if collection_processed == "all": 
-            query_transactions = f"""
+        # If both collections are considered $collection is null and the collection filter is skipped.
+        # All values are passed as parameters, so Neo4j can reuse the cached query plan
+        # The relationships are grouped by day number (timestamp / 86400) instead of creating a date for each of them
+        # A user that transacted and minted on the same day is counted once, therefore the relationships 
+        # of both types are combined in a single query and the accounts are counted distinct per day
+        query = """
+        CALL {
             MATCH (a:Account)-[r:TRANSACTED]->()
-            WHERE r.transaction_timestamp IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.transaction_timestamp}})) AS date, COLLECT(DISTINCT a) AS accounts
-            RETURN date, SIZE(accounts) AS number
-            ORDER BY date
-            """
-             
-            query_mint = f"""
-            MATCH (a:Account)-[r:MINT]->()
-            WHERE r.date IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.date}})) AS date, COLLECT(DISTINCT a) AS accounts
-            RETURN date, SIZE(accounts) AS number
-            ORDER BY date
-            """
-        else:
-            query_transactions = f"""
-            MATCH (a:Account)-[r:TRANSACTED]->()
-            WHERE r.transaction_timestamp IS NOT NULL 
-            AND r.collection_name = "{collection_processed}"
-            AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.transaction_timestamp}})) AS date, COLLECT(DISTINCT a) AS accounts
-            RETURN date, SIZE(accounts) AS number
-            ORDER BY date
-            """
-             
-            query_mint = f"""
-            MATCH (a:Account)-[r:MINT]->(n)
-            WHERE r.date IS NOT NULL 
-            AND n.collection_name = "{collection_processed}" 
-            AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.date}})) AS date, COLLECT(DISTINCT a) AS accounts
-            RETURN date, SIZE(accounts) AS number
-            ORDER BY date
-            """
+            WHERE ($collection IS NULL OR r.collection_name = $collection)
+            AND r.transaction_timestamp >= $ts_from AND r.transaction_timestamp < $ts_to
+            RETURN a, toInteger(r.transaction_timestamp / 86400) AS day
+            UNION
+            MATCH (a:Account)-[r:MINT]->(n:NFT)
+            WHERE ($collection IS NULL OR n.collection_name = $collection)
+            AND r.date >= $ts_from AND r.date < $ts_to
+            RETURN a, toInteger(r.date / 86400) AS day
+        }
+        RETURN day, COUNT(DISTINCT a) AS number
+        """
 
-        query_results_transaction = db.run_query('neo4j', query_transactions)
-        query_results_mint = db.run_query('neo4j', query_mint)
-
-        #Define the date range
-        start_date = datetime(year_from, month_from, 1)
-
-        # Calculate end_date as the last day of the month_to
-        last_day_of_month = calendar.monthrange(year_to, month_to)[1]
-        end_date = datetime(year_to, month_to, last_day_of_month)
-
-        date_to_count_transaction = {str(result['date']): result['number'] for result in query_results_transaction}
-        date_to_count_mint = {str(result['date']): result['number'] for result in query_results_mint}
-
-        dates = []
-        counts = []
-
-        # Iterate through each date in the specified range, to add a count = 0 for the dates that are not included in the 
-        # query result. Additionally the counts for transaction and mint are summed up
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = current_date.strftime('%Y-%m-%d')
-            dates.append(date_str)
-            count_temp = 0
-            # Check if the date is in the original results
-            if date_str in date_to_count_transaction:
-                count_temp += date_to_count_transaction[date_str]
-            if date_str in date_to_count_mint:
-                count_temp += date_to_count_mint[date_str]    
-            counts.append(count_temp)
-            # Move to the next day
-            current_date += timedelta(days=1)
-        
-        final_result = {
-                "dates": dates,
-                "counts": counts
-            }
+        date_to_count = _daily_counts(query, _utilities.get_collection_parameter(collection_processed), year_from, year_to, month_from, month_to)
+
+        final_result = self.create_history_result(year_from, year_to, month_from, month_to, date_to_count)
 
         return final_result
     
@@ -427,62 +354,20 @@ class HistoryLogic:
             list of collections in which the users where active in order to be counted as active
         """
 
-        db = get_db()
-        utilities = Utilities()
-
-        collection_processed = utilities.get_collection(collection)
-
-        # depending whether both collections are selected or not, the collection filter is added in the query
-        if collection_processed == "all": 
-            query_transactions = f"""
-            MATCH (a:Account)-[r:TRANSACTED]->()
-            WHERE r.transaction_timestamp IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.transaction_timestamp}})) AS date, COLLECT(DISTINCT a) AS accounts
-            RETURN date, SIZE(accounts) AS number
-            ORDER BY date
-            """
-        else:
-            query_transactions = f"""
-            MATCH (a:Account)-[r:TRANSACTED]->()
-            WHERE r.transaction_timestamp IS NOT NULL 
-            AND r.collection_name = "{collection_processed}"
-            AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.transaction_timestamp}})) AS date, COLLECT(DISTINCT a) AS accounts
-            RETURN date, SIZE(accounts) AS number
-            ORDER BY date
-            """
+        collection_processed = _utilities.get_collection(collection)
+
+        # If both collections are considered $collection is null and the collection filter is skipped.
+        # All values are passed as parameters, so Neo4j can reuse the cached query plan
+        # The relationships are grouped by day number (timestamp / 86400) instead of creating a date for each of them
+        query_transactions = """
+        MATCH (a:Account)-[r:TRANSACTED]->()
+        WHERE ($collection IS NULL OR r.collection_name = $collection)
+        AND r.transaction_timestamp >= $ts_from AND r.transaction_timestamp < $ts_to
+        WITH toInteger(r.transaction_timestamp / 86400) AS day, COUNT(DISTINCT a) AS number
+        RETURN day, number
+        """
 
-        query_results_transaction = db.run_query('neo4j', query_transactions)
-        date_to_count_transaction = {str(result['date']): result['number'] for result in query_results_transaction}
+        date_to_count_transaction = _daily_counts(query_transactions, _utilities.get_collection_parameter(collection_processed), year_from, year_to, month_from, month_to)
 
         final_result = self.create_history_result(year_from, year_to, month_from, month_to, date_to_count_transaction)
 
@@ -508,67 +393,63 @@ class HistoryLogic:
             list of collections in which the users where active in order to be counted as active
         """
 
-        db = get_db()
-        utilities = Utilities()
-
-        collection_processed = utilities.get_collection(collection)
-
-        # depending whether both collections are selected or not, the collection filter is added in the query
-        if collection_processed == "all": 
-            query_mint = f"""
-            MATCH (a:Account)-[r:MINT]->()
-            WHERE r.date IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.date}})) AS date, COLLECT(DISTINCT a) AS accounts
-            RETURN date, SIZE(accounts) AS number
-            ORDER BY date
-            """
-        else: 
-            query_mint = f"""
-            MATCH (a:Account)-[r:MINT]->(n)
-            WHERE r.date IS NOT NULL 
-            AND n.collection_name = "{collection_processed}" 
-            AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            WITH date(datetime({{epochSeconds: r.date}})) AS date, COLLECT(DISTINCT a) AS accounts
-            RETURN date, SIZE(accounts) AS number
-            ORDER BY date
-            """
+        collection_processed = _utilities.get_collection(collection)
+
+        # If both collections are considered $collection is null and the collection filter is skipped.
+        # All values are passed as parameters, so Neo4j can reuse the cached query plan
+        # The relationships are grouped by day number (timestamp / 86400) instead of creating a date for each of them
+        query_mint = """
+        MATCH (a:Account)-[r:MINT]->(n:NFT)
+        WHERE ($collection IS NULL OR n.collection_name = $collection)
+        AND r.date >= $ts_from AND r.date < $ts_to
+        WITH toInteger(r.date / 86400) AS day, COUNT(DISTINCT a) AS number
+        RETURN day, number
+        """
 
-        query_results_mint = db.run_query('neo4j', query_mint)
-        date_to_count_mint = {str(result['date']): result['number'] for result in query_results_mint}
+        date_to_count_mint = _daily_counts(query_mint, _utilities.get_collection_parameter(collection_processed), year_from, year_to, month_from, month_to)
 
         final_result = self.create_history_result(year_from, year_to, month_from, month_to, date_to_count_mint)
 
         return final_result
     
+    def get_dashboard_history(self, year_from: int, year_to: int, month_from: int, month_to: int, collection: List[str]):
+
+        """
+        This method returns all daily histories of the dashboard (transactions, mint events, active users, 
+        transacting users and minting users) for the same time frame and collection at once, so the frontend 
+        needs a single request instead of five. As all histories consider the same days, the dates are only 
+        returned once.
+
+        Parameters:
+        - year_from: int
+            The start year for the time frame
+        - year_to: int
+            The end year for the time frame.
+        - month_from: int 
+            The start month for the time frame.
+        - month_to: int 
+            The end month for the time frame
+        - Collection: List[str]
+            list of collections for which the relationships are counted 
+        """
+
+        transactions = self.get_transaction_history(year_from, year_to, month_from, month_to, collection)
+        mints = self.get_mint_history(year_from, year_to, month_from, month_to, collection)
+        active_users = self.get_active_users_history(year_from, year_to, month_from, month_to, collection)
+        active_users_transacting = self.get_active_users_transacting(year_from, year_to, month_from, month_to, collection)
+        active_users_mint = self.get_active_users_mint(year_from, year_to, month_from, month_to, collection)
+
+        final_result = {
+            "dates": transactions["dates"],
+            "transactions": transactions["counts"],
+            "mints": mints["counts"],
+            "active_users": active_users["counts"],
+            "active_users_transacting": active_users_transacting["counts"],
+            "active_users_mint": active_users_mint["counts"]
+        }
+
+        return final_result
+
     def get_collection_distribution(self, year_from: int, year_to: int, month_from: int, month_to: int):
         """
         This method counts the distribution of the collections for both transacted and minted events.
@@ -585,65 +466,30 @@ class HistoryLogic:
         - month_to: int
             The end month for the time frame
         """
-        db = get_db()
-
-        # Transactions query adjusted for collection filtering
-        transacted_query = f"""
-            MATCH (a:Account)-[r:TRANSACTED]->()
-            WHERE r.transaction_timestamp IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-            RETURN r.collection_name AS collection, COUNT(r) AS number
-            """
-
-        # Mints query adjusted for collection filtering
-        mint_query = f"""
-            MATCH (a:Account)-[r:MINT]->(n)
-            WHERE r.date IS NOT NULL 
-            AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-            RETURN n.collection_name AS collection, COUNT(r) AS number
+        # Transactions and mints are counted per month and collection in a single query, the counts 
+        # of both event types are added up by Neo4j
+        # the year and month are stored on the relationship at ingest, only relationships without them are converted
+        distribution_query = """
+            CALL {
+                MATCH (a:Account)-[r:TRANSACTED]->()
+                WHERE r.transaction_timestamp >= $ts_from AND r.transaction_timestamp < $ts_to
+                WITH CASE WHEN r.year IS NULL THEN datetime({epochSeconds: r.transaction_timestamp}).year ELSE r.year END AS year,
+                    CASE WHEN r.month IS NULL THEN datetime({epochSeconds: r.transaction_timestamp}).month ELSE r.month END AS month,
+                    r.collection_name AS collection
+                RETURN year, month, collection, COUNT(*) AS number
+                UNION ALL
+                MATCH (a:Account)-[r:MINT]->(n:NFT)
+                WHERE r.date >= $ts_from AND r.date < $ts_to
+                WITH CASE WHEN r.year IS NULL THEN datetime({epochSeconds: r.date}).year ELSE r.year END AS year,
+                    CASE WHEN r.month IS NULL THEN datetime({epochSeconds: r.date}).month ELSE r.month END AS month,
+                    n.collection_name AS collection
+                RETURN year, month, collection, COUNT(*) AS number
+            }
+            RETURN year, month, collection, sum(number) AS number
             """
 
-        # Execute queries
-        query_results_transacted = db.run_query('neo4j', transacted_query)
-        query_results_mint = db.run_query('neo4j', mint_query)
-
-        # Merge results from both queries
-        collection_counts = {}
-        for result in query_results_transacted + query_results_mint:
-            collection = result['collection']
-            number = result['number']
-            if collection in collection_counts:
-                collection_counts[collection] += number
-            else:
-                collection_counts[collection] = number
+        # Execute query, the monthly counts are only loaded for the months which are not cached yet
+        collection_counts = _collection_counts(distribution_query, year_from, year_to, month_from, month_to)
 
         # Prepare final results for plotting
         collections = list(collection_counts.keys())
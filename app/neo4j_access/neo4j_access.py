@@ -3,8 +3,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Neo4jInstance:
-    def __init__(self, uri, user, password):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, uri, user, password, **driver_config):
+        # the driver keeps a pool of connections, every session borrows one of them instead of opening a new connection
+        self.driver = GraphDatabase.driver(uri, auth=(user, password), **driver_config)
     
     def close(self):
         self.driver.close()
@@ -14,13 +15,31 @@ class Neo4jInstance:
             result = session.run(query, parameters)
             return [record for record in result]
 
+    def run_query_stream(self, target_db, query, parameters=None):
+        # yields the records one at a time while they are fetched, instead of materializing the whole result
+        with self.driver.session(database=target_db) as session:
+            result = session.run(query, parameters)
+            yield from result
+
+    def run_write(self, target_db, query, parameters=None):
+        # runs the query within a managed write transaction, which is retried by the driver on transient errors
+        def write(tx):
+            return tx.run(query, parameters).consume()
+
+        with self.driver.session(database=target_db) as session:
+            return session.execute_write(write)
+
+    def run_query_values(self, target_db, query, parameters=None, *keys):
+        # returns the values of the given keys as plain lists (one per record), no Record objects are kept
+        with self.driver.session(database=target_db) as session:
+            result = session.run(query, parameters)
+            return result.values(*keys)
+
     def test_connection(self,target_db):
         try:
-            with self.driver.session(database=target_db)  as session:
-                # Running a simple query to fetch the Neo4J version
-                result = session.run("RETURN 'Connection successful!' as message")
-                message = result.single()[0]
-                return message
+            # the driver checks the connection with a handshake, no session is opened and no query is run
+            self.driver.verify_connectivity()
+            return "Connection successful!"
         except Exception as e:
             return f"An error occurred: {e}"
     
@@ -1,9 +1,122 @@
 from app.db import get_db
 from app.exceptions.not_exists import NotExistsException
 from typing import List
+from functools import lru_cache
 from app.neo4j_access.utilities import Utilities
 import logging
 
+# Utilities is stateless, a single instance is shared by all requests
+_utilities = Utilities()
+
+@lru_cache(maxsize=512)
+def _ranking(rank_query: str, collection_processed: str, limit: int, year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Runs the ranking query and returns the ranking as a tuple of the identifiers and a tuple of their counts. 
+    The rankings are cached per (query, collection, limit, time frame), as the dashboard requests the same 
+    rankings repeatedly and the data only changes with an update.
+
+    Parameters:
+    - rank_query: str
+        the query for the scope of the ranking, as returned by RankLogic.get_query
+    - collection_processed: str
+        collection as it is stored in the database or "all" in case both collections are considered
+    - limit: int
+        The maximum number of items to return
+    - year_from, year_to, month_from, month_to: int
+        the time period
+    """
+
+    db = get_db()
+
+    # the time frame is filtered as a range of unix timestamps, which allows an index seek on the timestamps
+    ts_from, ts_to = _utilities.get_timestamp_range(year_from, year_to, month_from, month_to)
+    # all values are passed as parameters, so the query text only depends on the scope and Neo4j can reuse its plan
+    parameters = {
+        "collection": _utilities.get_collection_parameter(collection_processed),
+        "limit": limit,
+        "ts_from": ts_from,
+        "ts_to": ts_to
+    }
+
+    # the single row of the ranking is read as plain values, without a lookup by key on a Record
+    [(identifiers, counts)] = db.run_query_values('neo4j', rank_query, parameters, "identifiers", "counts")
+
+    return tuple(identifiers), tuple(counts)
+
+def clear_ranking_cache():
+    """
+    Clears the cached rankings. Needs to be called whenever new data is inserted into the database.
+    """
+
+    _ranking.cache_clear()
+
+# The ranking queries, one per scope. If both collections are considered $collection is null and the 
+# collection filter is skipped, so the same query (and its cached plan) is used for every collection. 
+# The relationships are counted per address (identifier for NFT), as there can be several Account nodes with 
+# the same address, and only the top entries are kept (ORDER BY ... LIMIT in the WITH), so Neo4j keeps the 
+# top $limit counts instead of sorting all of them. 
+# The ranking is returned as a single row with the identifiers and the counts as two lists (in the order 
+# of the ranking), instead of one record per entry
+
+# rank owners based on transaction-volume
+_ACCOUNT_TRANSACTION_QUERY = """
+    MATCH (a:Account)
+    MATCH (a)-[r:TRANSACTED]-()
+    WHERE ($collection IS NULL OR r.collection_name = $collection)
+    AND r.transaction_timestamp >= $ts_from AND r.transaction_timestamp < $ts_to
+    WITH a.address AS identifier, count(r) AS count
+    ORDER BY count DESC
+    LIMIT $limit
+    RETURN collect(identifier) AS identifiers, collect(count) AS counts
+"""
+
+# rank owners based on their number of currently owned NFT
+_CONCENTRATION_OWNERSHIP_QUERY = """
+    MATCH (a:Account)
+    MATCH (a)-[r:OWNED]-(n)
+    WHERE ($collection IS NULL OR n.collection_name = $collection)
+    AND r.until IS NOT NULL
+    AND r.from >= $ts_from
+    AND (r.currently_owned = true OR (r.currently_owned = false AND r.until < $ts_to))
+    WITH a.address AS identifier, count(r) AS count
+    ORDER BY count DESC
+    LIMIT $limit
+    RETURN collect(identifier) AS identifiers, collect(count) AS counts
+"""
+
+# rank owners based on their contribution for a collection (how many NFT they minted)
+_CONTRIBUTION_QUERY = """
+    MATCH (a:Account)
+    MATCH (a)-[r:MINT]-(n)
+    WHERE ($collection IS NULL OR n.collection_name = $collection)
+    AND r.date >= $ts_from AND r.date < $ts_to
+    WITH a.address AS identifier, count(r) AS count
+    ORDER BY count DESC
+    LIMIT $limit
+    RETURN collect(identifier) AS identifiers, collect(count) AS counts
+"""
+
+# rank NFT based on the amount of ownership changes, only available for a single collection
+_OWNERSHIP_CHANGES_QUERY = """
+    MATCH (n:NFT)
+    MATCH (n)-[r:OWNED]-()
+    WHERE n.collection_name = $collection
+    AND r.until IS NOT NULL
+    AND r.from >= $ts_from
+    AND (r.currently_owned = true OR (r.currently_owned = false AND r.until < $ts_to))
+    WITH n.identifier AS identifier, count(r) AS count
+    ORDER BY count DESC
+    LIMIT $limit
+    RETURN collect(identifier) AS identifiers, collect(count) AS counts
+"""
+
+_RANKING_QUERIES = {
+    "ACCOUNT_TRANSACTION": _ACCOUNT_TRANSACTION_QUERY,
+    "CONCENTRATION_OWNERSHIP": _CONCENTRATION_OWNERSHIP_QUERY,
+    "CONTRIBUTION": _CONTRIBUTION_QUERY,
+    "OWNERSHIP_CHANGES": _OWNERSHIP_CHANGES_QUERY,
+}
+
 class RankLogic:
 
     """
@@ -53,164 +166,17 @@ class RankLogic:
 
         logging.info("identify the correct query for the ranking")
 
-        # rank owners based on transaction-volume
-        if scope.upper() == "ACCOUNT_TRANSACTION":
-            # in case no collection is specified, no filter on collection is applied
-            if collection == "all":
-                return f"""
-                MATCH (a:Account)
-                MATCH (a)-[r:TRANSACTED]-()
-                WHERE r.transaction_timestamp IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-                RETURN a.address as Identifier, count(r) AS count
-                ORDER BY count DESC
-                LIMIT {limit}
-                """
-            else:
-                return f"""
-                MATCH (a:Account)
-                MATCH (a)-[r:TRANSACTED]-()
-                WHERE r.collection_name = "{collection}"
-                AND r.transaction_timestamp IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.transaction_timestamp}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.transaction_timestamp}}).month <= {month_to}))
-                RETURN a.address as Identifier, count(r) AS count
-                ORDER BY count DESC
-                LIMIT {limit}
-                """
-        # rank owners based on their number of currently owned NFT
-        elif scope.upper() == "CONCENTRATION_OWNERSHIP":
-            # in case no collection is specified, no filter on collection is applied
-            if collection == "all":
-                return f"""
-                MATCH (a:Account)
-                MATCH (a)-[r:OWNED]-(n)
-                WHERE r.from IS NOT NULL
-                AND r.until IS NOT NULL
-                AND datetime({{epochSeconds: r.from}}).year >= {year_from}
-                AND (r.currently_owned = true OR (r.currently_owned = false AND datetime({{epochSeconds: r.until}}).year <= {year_to}))
-                AND datetime({{epochSeconds: r.from}}).month >= {month_from}
-                AND (r.currently_owned = true OR (r.currently_owned = false AND datetime({{epochSeconds: r.until}}).month <={month_to}))
-                RETURN a.address as Identifier, count(r) AS count
-                ORDER BY count DESC
-                LIMIT {limit}
-                """
-            else:
-                return f"""
-                MATCH (a:Account)
-                MATCH (a)-[r:OWNED]-(n)
-                WHERE n.collection_name = "{collection}"
-                AND r.from IS NOT NULL
-                AND r.until IS NOT NULL
-                AND datetime({{epochSeconds: r.from}}).year >= {year_from}
-                AND (r.currently_owned = true OR (r.currently_owned = false AND datetime({{epochSeconds: r.until}}).year <= {year_to}))
-                AND datetime({{epochSeconds: r.from}}).month >= {month_from}
-                AND (r.currently_owned = true OR (r.currently_owned = false AND datetime({{epochSeconds: r.until}}).month <={month_to}))
-                RETURN a.address as Identifier, count(r) AS count
-                ORDER BY count DESC
-                LIMIT {limit}
-                """
-        # rank owners based on their contribution for a collection (how many NFT they minted)
-        elif scope.upper() == "CONTRIBUTION":
-            # in case no collection is specified, no filter on collection is applied
-            if collection == "all":
-                return f"""
-                MATCH (a:Account)
-                MATCH (a)-[r:MINT]-(n)
-                WHERE r.date IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-                RETURN a.address as Identifier, count(r) AS count
-                ORDER BY count DESC
-                LIMIT {limit}
-                """
-            else:
-                return f"""
-                MATCH (a:Account)
-                MATCH (a)-[r:MINT]-(n)
-                WHERE n.collection_name = "{collection}" 
-                AND r.date IS NOT NULL 
-                AND ((datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to})
-                OR 
-                    (datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_from}
-                    AND datetime({{epochSeconds: r.date}}).year < {year_to}
-                    AND datetime({{epochSeconds: r.date}}).month >= {month_from})
-                OR
-                    (datetime({{epochSeconds: r.date}}).year = {year_to}
-                    AND datetime({{epochSeconds: r.date}}).year > {year_from}
-                    AND datetime({{epochSeconds: r.date}}).month <= {month_to}))
-                RETURN a.address as Identifier, count(r) AS count
-                ORDER BY count DESC
-                LIMIT {limit}
-                """
-        # rank NFT based on the amount of ownership changes
-        elif scope.upper() == "OWNERSHIP_CHANGES":
-            # a collection always need to be stated in case NFTs are returned (part of the key for NFT)
-            if collection == "all":
-                raise NotExistsException("Collection is part of the key for NFTs and a single one need to be specified!")
-
-            return f"""
-            MATCH (n:NFT)
-            MATCH (n)-[r:OWNED]-()
-            WHERE n.collection_name = "{collection}"
-            AND r.from IS NOT NULL
-            AND r.until IS NOT NULL
-            AND datetime({{epochSeconds: r.from}}).year >= {year_from} 
-            AND (r.currently_owned = true OR (r.currently_owned = false AND datetime({{epochSeconds: r.until}}).year <= {year_to}))
-            AND datetime({{epochSeconds: r.from}}).month >= {month_from} 
-            AND (r.currently_owned = true OR (r.currently_owned = false AND datetime({{epochSeconds: r.until}}).month <= {month_to}))
-            RETURN n.identifier as Identifier, count(r) AS count
-            ORDER BY count DESC
-            LIMIT {limit}
-            """
-        else:
-            raise NotExistsException("ranking not available") 
+        scope_upper = scope.upper()
+
+        # a collection always need to be stated in case NFTs are returned (part of the key for NFT)
+        if scope_upper == "OWNERSHIP_CHANGES" and collection == "all":
+            raise NotExistsException("Collection is part of the key for NFTs and a single one need to be specified!")
+
+        rank_query = _RANKING_QUERIES.get(scope_upper)
+        if rank_query is None:
+            raise NotExistsException("ranking not available")
+
+        return rank_query
         
 
     def get_ranking(self, scope: str, collection: List[str], limit: int, year_from: int, year_to: int, month_from: int, month_to: int):
@@ -241,22 +207,20 @@ class RankLogic:
 
         logging.info("START: creating the ranking")
 
-        db = get_db()
-        utilities = Utilities()
-
-        collection_pro = utilities.get_collection(collection)
+        collection_pro = _utilities.get_collection(collection)
 
         rank_query = self.get_query(scope, collection_pro, limit, year_from, year_to, month_from, month_to)
 
-        rank_query_result = db.run_query('neo4j', rank_query)
-        logging.info("Ranking completed")
+        identifiers, counts = _ranking(rank_query, collection_pro, limit, year_from, year_to, month_from, month_to)
+        cache_info = _ranking.cache_info()
+        logging.info(f"Ranking completed (cache hits: {cache_info.hits}, misses: {cache_info.misses})")
 
         # prepare the result in the form of the response model
         ranking = [
             {
-            "identifier": record["Identifier"],
-            "count": record["count"]
-            } for record in rank_query_result]
+            "identifier": identifier,
+            "count": count
+            } for identifier, count in zip(identifiers, counts)]
         
         final_result = {
             "ranking": ranking
@@ -3,8 +3,38 @@ import logging
 from app.db import get_db
 from app.exceptions.node_not_found import NodeNotFoundException
 import datetime
+from functools import lru_cache
 from app.neo4j_access.utilities import Utilities
 
+# Utilities is stateless, a single instance is shared by all requests
+_utilities = Utilities()
+
+# the mint dates are formatted once per timestamp, many NFTs of a collection are minted at the same time
+@lru_cache(maxsize=1024)
+def _format_timestamp(timestamp):
+    return str(datetime.datetime.fromtimestamp(timestamp))
+
+# creates the response object of a node (depending on the type of node - Owner or NFT), it is used for the 
+# neighbors and for the start and end nodes of the relationships
+def _format_node(node):
+    if 'Account' in node.labels:
+        address = node['address']
+        return {
+            "value": address,
+            "link": Utilities.get_etherscan_url_address(address),
+            "collection": "",
+            "type": "Account",
+            "image": ""
+        }
+    collection_name, identifier = node["collection_name"], node['identifier']
+    return {
+        "value": identifier,
+        "link": Utilities.get_opensea_url(collection_name, identifier),
+        "collection": collection_name,
+        "type": "NFT",
+        "image": node["image_url"]
+    }
+
 # Including the logic to find Accounts (basend on their address) and NFTs (based on their identifier and collection)
 class SearchLogic:
 
@@ -17,7 +47,7 @@ class SearchLogic:
     -------
     - process_neighbors(self, neighbors: List[Dict])
         internal method to create the neighbor-response objects for the search result
-    - process_relationships(self, neighbor_relationships: List[Dict])
+    - process_relationships(self, relationships: List, node_dicts: Dict)
         internal method to create the relationship-response objects for the search result
     - find_account(self, address: str)
         method to search an Owner with the given address
@@ -42,31 +72,11 @@ class SearchLogic:
             methods to search an Owner or NFT
         """
 
-        utilities = Utilities()
-
-        processed_neighbors = []
-        for neighbor in neighbors:
-            if 'Account' in neighbor.labels:
-                neighbor_dict = {
-                    "value": neighbor['address'],
-                    "link": utilities.get_etherscan_url_address(neighbor['address']),
-                    "collection": "",
-                    "type": "Account",
-                    "image": ""
-                }
-            else:
-                neighbor_dict = {
-                    "value": neighbor['identifier'],
-                    "link": utilities.get_opensea_url(neighbor["collection_name"], neighbor['identifier']),
-                    "collection": neighbor["collection_name"],
-                    "type": "NFT",
-                    "image": neighbor["image_url"]
-                }
-            processed_neighbors.append(neighbor_dict)
+        processed_neighbors = [_format_node(neighbor) for neighbor in neighbors]
 
         return processed_neighbors
     
-    def process_relationships(self, neighbor_relationships: List[Dict]):
+    def process_relationships(self, relationships: List, node_dicts: Dict):
 
         """
         Based on a list of relationships as they are returned from the cypher query, this 
@@ -74,50 +84,23 @@ class SearchLogic:
         creates the relationship-objects for the endpoint response model. 
 
         Parameters:
-        - neighbor_relationships: List[Dict]
-            List of relationship-objects as the are returned by the cypher query defined in the 
+        - relationships: List
+            List of relationships as the are returned by the cypher query defined in the 
             methods to search an Owner or NFT
+        - node_dicts: Dict
+            the node-objects of the searched node and its neighbors by their element id, the start 
+            and end node of every relationship are resolved from it (the query only returns their ids)
         """
 
-        utilities = Utilities()
+        # the link method is looked up once instead of for every relationship
+        get_etherscan_url_transaction = Utilities.get_etherscan_url_transaction
 
         processed_relations = []
-        for relation in neighbor_relationships:
-
-            start_node = relation['start']
-            end_node = relation['end']
-            rel = relation['relation']
-            
-            # Start node = Owner?
-            if 'Account' in start_node.labels:
-                start_node_dict = {
-                    "value": start_node['address'],
-                    "collection": "",
-                    "type": "Account",
-                    "image": ""
-                }
-            else: # Start node = NFT
-                start_node_dict = {
-                    "value": start_node['identifier'],
-                    "collection": start_node["collection_name"],
-                    "type": "NFT",
-                    "image": start_node["image_url"]
-                }
-            # Start node = Owner?
-            if 'Account' in end_node.labels:
-                end_node_dict = {
-                    "value": end_node['address'],
-                    "collection": "",
-                    "type": "Account",
-                    "image": ""
-                }
-            else: # Start node = NFT
-                end_node_dict = {
-                    "value": end_node['identifier'],
-                    "collection": end_node["collection_name"],
-                    "type": "NFT",
-                    "image": end_node["image_url"]
-                }
+        for rel in relationships:
+
+            start_node_dict = node_dicts[rel.start_node.element_id]
+            end_node_dict = node_dicts[rel.end_node.element_id]
+
             # check for the correct transaction type
             if rel.type== "TRANSACTED":
                 rel_dict = {
@@ -126,7 +109,7 @@ class SearchLogic:
                     "transaction_event_type": rel["event_type"],
                     "nft_identifier": rel["identifier"],
                     "nft_collection": rel["collection_name"],
-                    "link_etherscan": utilities.get_etherscan_url_transaction(rel["transaction_hash"])
+                    "link_etherscan": get_etherscan_url_transaction(rel["transaction_hash"])
                 }
             elif rel.type == "OWNED":
                 rel_dict = {
@@ -139,7 +122,7 @@ class SearchLogic:
                 }
             else: # MINT
                 rel_dict = {
-                    "property": str(datetime.datetime.fromtimestamp(rel["date"])),
+                    "property": _format_timestamp(rel["date"]),
                     "type": rel.type,
                     "transaction_event_type": "",
                     "nft_identifier": "",
@@ -174,17 +157,25 @@ class SearchLogic:
         logging.info(f"search the owner with the address {address}")
 
         db = get_db()
-        utlities = Utilities()
 
         # Query to find the owner. Returns the searched Owner, his direct neighbors and the 
-        # respective realtionships
+        # respective realtionships. The start and end nodes of the relationships are not returned 
+        # again, they are resolved from the neighbors and the searched Owner.
+        # The NFT neighbors of both collections are counted within the query, all NFT which are not 
+        # part of the degods collection are counted as boredapes
         query = """
         MATCH (account:Account {address: $address})
         OPTIONAL MATCH (account)-[r]-(neighbor)
         WHERE neighbor:Account OR neighbor:NFT
-        RETURN account.address AS accountAddress, 
-        collect(DISTINCT neighbor) AS neighbors, 
-        [r IN collect(r) | {start: startNode(r), end: endNode(r), relation: r}] AS neighborRelationships
+        WITH account, collect(DISTINCT neighbor) AS neighbors, collect(r) AS relationships
+        WITH account, neighbors, relationships, 
+        size([n IN neighbors WHERE n:NFT]) AS countNft, 
+        size([n IN neighbors WHERE n:NFT AND n.collection_name = "degods-eth"]) AS countNftDegods
+        RETURN account, 
+        neighbors, 
+        relationships, 
+        countNftDegods, 
+        countNft - countNftDegods AS countNftBoredapes
         """
 
         neighborhood = db.run_query('neo4j', query, {"address": address}) 
@@ -196,28 +187,25 @@ class SearchLogic:
 
         # extract the different parts of the query-result
         account_data = neighborhood[0]
-        account_address = account_data['accountAddress']
+        account = account_data['account']
+        account_address = account['address']
         neighbors = account_data['neighbors']
-        neighbor_relationships = account_data['neighborRelationships']
-
-        count_nft_boredapes = 0
-        count_nft_degods = 0
-        for neighbor in neighbors:
-            if "NFT" in neighbor.labels:
-                if neighbor["collection_name"] == "degods-eth":
-                    count_nft_degods += 1
-                else:
-                    count_nft_boredapes += 1
+        relationships = account_data['relationships']
+
+        count_nft_boredapes = account_data['countNftBoredapes']
+        count_nft_degods = account_data['countNftDegods']
         
         # Process neighbors
         processed_neighbors = self.process_neighbors(neighbors)
 
-        # Process relationships
-        processed_relations = self.process_relationships(neighbor_relationships)
+        # Process relationships, the node-objects of the neighbors are reused for the relationships
+        node_dicts = {neighbor.element_id: neighbor_dict for neighbor, neighbor_dict in zip(neighbors, processed_neighbors)}
+        node_dicts[account.element_id] = _format_node(account)
+        processed_relations = self.process_relationships(relationships, node_dicts)
 
         final_result = {
             "account": account_address,
-            "link": utlities.get_etherscan_url_address(account_address),
+            "link": _utilities.get_etherscan_url_address(account_address),
             "count_nft_boredapes": count_nft_boredapes,
             "count_nft_degods": count_nft_degods,
             "neighbors": processed_neighbors,
@@ -250,19 +238,17 @@ class SearchLogic:
         logging.info(f"START: search the NFT with identifier: {identifier} and collection: {collection}")
 
         db = get_db()
-        utilities = Utilities()
 
         # Query to find the NFT. Returns the searched NFT, his direct neighbors and the 
-        # respective realtionships
+        # respective realtionships. The start and end nodes of the relationships are not returned 
+        # again, they are resolved from the neighbors and the searched NFT.
         query = """
         MATCH (nft:NFT {identifier: $identifier, collection_name: $collection})
         OPTIONAL MATCH (nft)-[r]-(neighbor)
         WHERE neighbor:Account OR neighbor:NFT
-        RETURN nft.identifier AS nftIdentifier, nft.collection_name AS nftCollectionName, nft.image_url AS image_url, 
-        collect(DISTINCT neighbor) AS neighbors, 
-        [r IN collect(r) | {start: startNode(r), end: endNode(r), relation: r}] AS neighborRelationships
+        RETURN nft, collect(DISTINCT neighbor) AS neighbors, collect(r) AS relationships
         """
-        collection_processed = utilities.get_collection([collection])
+        collection_processed = _utilities.get_collection([collection])
         neighborhood = db.run_query('neo4j', query, {"identifier": identifier, "collection": collection_processed}) 
 
         # if the address doesn't exist 
@@ -272,22 +258,25 @@ class SearchLogic:
 
         # extract the different parts of the query-result
         nft_data = neighborhood[0]
-        nft_identifier = nft_data['nftIdentifier']
-        nft_image = nft_data['image_url']
-        nft_collection = nft_data['nftCollectionName']
+        nft = nft_data['nft']
+        nft_identifier = nft['identifier']
+        nft_image = nft['image_url']
+        nft_collection = nft['collection_name']
         neighbors = nft_data['neighbors']
-        neighbor_relationships = nft_data['neighborRelationships']
+        relationships = nft_data['relationships']
 
         # Process neighbors
         processed_neighbors = self.process_neighbors(neighbors)
 
-        # Process relationships
-        processed_relations = self.process_relationships(neighbor_relationships)
+        # Process relationships, the node-objects of the neighbors are reused for the relationships
+        node_dicts = {neighbor.element_id: neighbor_dict for neighbor, neighbor_dict in zip(neighbors, processed_neighbors)}
+        node_dicts[nft.element_id] = _format_node(nft)
+        processed_relations = self.process_relationships(relationships, node_dicts)
 
         final_result = {
             "identifier": nft_identifier,
             "collection": nft_collection,
-            "opensea_url": utilities.get_opensea_url(nft_collection, nft_identifier),
+            "opensea_url": _utilities.get_opensea_url(nft_collection, nft_identifier),
             "image_url": nft_image,
             "neighbors": processed_neighbors,
             "relationships": processed_relations
@@ -2,11 +2,37 @@ from dotenv import load_dotenv
 from app.db import get_db
 from app.cache import connect_to_redis, delete_cache_keys
 from ..opensea_api import query_api
+from app.neo4j_access.equality_functionality import clear_count_cache
+from app.neo4j_access.history_functionality import clear_history_cache
+from app.neo4j_access.ranking_functionality import clear_ranking_cache
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from itertools import islice
 import logging
 import time
 load_dotenv()
 
+# number of identifiers which are fetched from Opensea at the same time
+OPENSEA_WORKERS = 4
+
+# maximum number of identifiers which are submitted for fetching and not yet written
+OPENSEA_FETCH_WINDOW = OPENSEA_WORKERS * 4
+
+# maximum number of pages which are fetched from Opensea for one identifier
+OPENSEA_PAGE_CAP = 200
+
+# maximum number of events which are written within one transaction (a transaction holds the events of whole NFTs, 
+# it can therefore exceed this number by the events of the last NFT)
+WRITE_BATCH_SIZE = 1000
+
+# collection names as they are used for the Update_Info nodes, other names are used unchanged
+PROCESSED_COLLECTION_NAMES = {
+    'degods-eth': 'degods',
+    'boredapeyachtclub': 'boredapeyachtclub',
+    'complete': 'complete',
+}
+
 class UpdateFunctionality:
 
     @staticmethod
@@ -24,12 +50,22 @@ class UpdateFunctionality:
         start the update process.
     - create_update_node(self,collection_name,updated_at)
         create nodes to record the status of updating.
-    - get_identifier_id_list(self,collection_name)
-        retrieve all identifier related to specified collection.
-    - insert_new_trx_data(self,data)
-        insert new transaction record into neo4j database.
+    - get_identifier_id_list(self,collection_name,updated_before)
+        retrieve all identifier related to specified collection (optionally only the ones to update).
+    - insert_new_trx_data(self,events)
+        insert a page of new transaction records into neo4j database.
+    - get_event_parameters(self,data)
+        turn one Opensea event into the parameters of the insert query.
+    - set_year_month_properties(self)
+        store the year and month of the timestamp on the TRANSACTED and MINT relationships.
     - get_data_from_opensea(self,updated_at,update_till,collection_address,ids_list)
         retrieve new transaction records from Opensea.
+    - write_events(self,collection_name,events,updates)
+        insert the events of several NFTs in one transaction and mark the NFTs as updated.
+    - fetch_identifier_events(self,collection_address,identifier,last_updated_unix,current_time_unix,cursor)
+        retrieve all pages of new transaction records of one NFT from Opensea.
+    - save_update_cursor(self,collection_name,identifier,cursor,till)
+        save the cursor of an incomplete update on the NFT node.
     - update_update_info(self,latest_block_time,collection_name)
         update the status nodes
     - get_last_update(self)
@@ -60,15 +96,16 @@ class UpdateFunctionality:
         #First get the current blocktime
         current_unix_timestamp = int(time.time())
         logging.info(f"Current time in unix:{current_unix_timestamp}")
-        query = f"""
+        query = """
         MATCH (n:Update_Info)
-        WHERE n.collection_name = '{self.get_processed_collection_name(collection_name)}'
+        WHERE n.collection_name = $collection_name
         RETURN n
         """
         #Get all ids to update
-        result = self.db.run_query('neo4j', query)
+        result = self.db.run_query('neo4j', query, parameters={'collection_name': self.get_processed_collection_name(collection_name)})
         result = result[0]['n']._properties
-        idList_info = self.get_identifier_id_list(collection_name)
+        # only the NFTs which were not updated within the last 2 days are updated
+        idList_info = self.get_identifier_id_list(collection_name,current_unix_timestamp - (2 * 86400))
         # print(len(idList_info))
         # print(idList_info[0])
         
@@ -81,140 +118,158 @@ class UpdateFunctionality:
         print("done")
         self.saveUpdateTimeToRedis()
         delete_cache_keys("application-cache:*")
+        clear_count_cache()
+        clear_history_cache()
+        clear_ranking_cache()
 
     def set_update_frequency(self,collection_name,frequency):
-        query = f"""
+        query = """
         MATCH (n:Update_Info)
-        WHERE n.collection_name = '{self.get_processed_collection_name(collection_name)}'
+        WHERE n.collection_name = $collection_name
         SET n.update_frequency	 = $frequency
         """
-        self.db.run_query('neo4j',query,parameters={'frequency':frequency})
+        self.db.run_query('neo4j',query,parameters={'collection_name': self.get_processed_collection_name(collection_name),
+                    'frequency':frequency})
         
-    def get_identifier_id_list(self,collection_name):
+    def get_identifier_id_list(self,collection_name,updated_before=None):
         """
         Retrieve a list of NFT identifiers given the collection name.
         Parameters:
         - collection_name: str
             relate to which collection.
+        - updated_before: int
+            only the NFTs which were last updated at or before this time (unix) are returned, all NFTs if None.
         """
-        query = f"""
+        # updated_at is stored as a string, the NFTs which don't need an update are filtered by neo4j
+        query = """
         MATCH (n:NFT)
-        WHERE n.collection_name = '{self.get_processed_collection_name(collection_name)}'
-        RETURN n.identifier AS identifier, n.updated_at AS updated_at
+        WHERE n.collection_name = $collection_name
+        AND ($updated_before IS NULL OR toInteger(n.updated_at) <= $updated_before)
+        RETURN n.identifier AS identifier, n.updated_at AS updated_at, n.update_cursor AS update_cursor, 
+        n.update_till AS update_till
         """
-        idList = self.db.run_query('neo4j',query)
-        idList = [{'id': one['identifier'],'updated_at':one['updated_at']} for one in idList]
+        idList = self.db.run_query('neo4j',query,parameters={'collection_name': self.get_processed_collection_name(collection_name),
+                    'updated_before': updated_before})
+        idList = [{'id': one['identifier'],'updated_at':one['updated_at'],
+                   'update_cursor':one['update_cursor'],'update_till':one['update_till']} for one in idList]
         return idList
     
-    def insert_new_trx_data(self,data):
+    def insert_new_trx_data(self,events):
         """
-        Insert new transaction or transfer record into neo4j database. 
+        Insert new transaction or transfer records into neo4j database. 
+        All events are written with a single query in one write transaction, instead of three queries per event.
         
         Parameters:
-        - data: dict
-            transaction data.
+        - events: list
+            transaction data (asset_events as returned by Opensea).
         """
+        # placeholder community ids for new accounts until the next community detection sets them
         mock_data= [1,2,3]
-        query0 = """
-        MERGE (to_address:Account {address: $to_address,boredapeyachtclub_com_id_list:$mock_data,complete_com_id_list:$mock_data,degods_com_id_list:$mock_data})
-        MERGE (from_address:Account {address: $from_address,boredapeyachtclub_com_id_list:$mock_data,complete_com_id_list:$mock_data,degods_com_id_list:$mock_data})
-        """
+        # the events are processed in the given order, the ownership of a NFT is therefore updated in the same order
+        # as before. The OWNED relationships are only merged if the NFT exists, the TRANSACTED relationship is 
+        # created in any case.
+        # The accounts are merged on their address only, an existing account is matched regardless of its community ids 
+        # (which are set by the community detection) and keeps them.
+        query = """
+        UNWIND $events AS e
+        MERGE (to_address:Account {address: e.to_address})
+        ON CREATE SET to_address.boredapeyachtclub_com_id_list = $mock_data, to_address.complete_com_id_list = $mock_data, to_address.degods_com_id_list = $mock_data
+        MERGE (from_address:Account {address: e.from_address})
+        ON CREATE SET from_address.boredapeyachtclub_com_id_list = $mock_data, from_address.complete_com_id_list = $mock_data, from_address.degods_com_id_list = $mock_data
         
-        query1 = """
-        MATCH (from_address:Account {address: $from_address}),(nft:NFT {identifier: $identifier,collection_name: $collection_name})
-        MERGE (from_address)-[ro:OWNED]->(nft)
-        ON CREATE SET ro.currently_owned = $not_owned, ro.until = $from_until
-        ON MATCH SET ro.currently_owned = $not_owned, ro.until = $from_until
+        WITH e, from_address, to_address
+        CALL {
+            WITH e, from_address, to_address
+            MATCH (nft:NFT {identifier: e.identifier,collection_name: e.collection_name})
+            MERGE (from_address)-[ro:OWNED]->(nft)
+            SET ro.currently_owned = false, ro.until = e.time_stamp
+            MERGE (to_address)-[r:OWNED]->(nft)
+            SET r.currently_owned = true, r.from = e.time_stamp, r.until = 0
+        }
         
-        WITH ro
-
-        MATCH (to_address:Account {address: $to_address}), (nft:NFT {identifier: $identifier,collection_name: $collection_name})
-        MERGE (to_address)-[r:OWNED]->(nft)
-        ON CREATE SET r.currently_owned = $yes_owned, r.from = $time_stamp, r.until = $to_until
-        ON MATCH SET r.currently_owned = $yes_owned, r.from = $time_stamp, r.until = $to_until    
-
-        """
-        #For transfer trx
-        query2_transfer = """
-        MATCH (from_address:Account {address: $from_address}),(to_address:Account {address: $to_address})
-        CREATE (from_address)-[:TRANSACTED {
-        event_type: $event_type,
-        collection_name: $collection_name,
-        transaction_hash: $transaction_hash,
-        transaction_timestamp: $time_stamp,
-        identifier: $identifier
-        }]->(to_address)
-        """
-        #For sale
-        query2_sale = """
-        MATCH (from_address:Account {address: $from_address}),(to_address:Account {address: $to_address})
-        CREATE (from_address)-[:TRANSACTED {
-        event_type: $event_type,
-        collection_name: $collection_name,
-        transaction_hash: $transaction_hash,
-        transaction_timestamp: $time_stamp,
-        identifier: $identifier,
-        transaction_value: $transaction_value,
-        transaction_token_symbol: $transaction_token_symbol,
-        transaction_token_decimals: $transaction_token_decimals,
-        transaction_token: $transaction_token
-        }]->(to_address)
-        """
-        self.db.run_query("neo4j",query0,parameters={"to_address":data['to_address'],
-                    "from_address" : data['from_address'],
+        CREATE (from_address)-[t:TRANSACTED]->(to_address)
+        SET t = e.transacted,
+        t.year = datetime({epochSeconds: e.time_stamp}).year,
+        t.month = datetime({epochSeconds: e.time_stamp}).month
+        """
+        rows = [self.get_event_parameters(data) for data in events]
+        self.db.run_write("neo4j",query,parameters={"events": rows,
                     "mock_data" : mock_data})
 
-        self.db.run_query("neo4j",query1,parameters={"to_address":data['to_address'],
-                    "from_address" : data['from_address'],
-                    "time_stamp":data['event_timestamp'],
-                    "not_owned" : False,
-                    "from_until" : data['event_timestamp'],
-                    "to_until" : 0,
-                    "yes_owned" :True,
-                    "identifier": data['nft']['identifier'],
-                    "collection_name" : data['nft']['collection']})
-        
+    def get_event_parameters(self,data):
+        """
+        Turn one event as returned by Opensea into the parameters of the insert query, 
+        including the properties of the TRANSACTED relationship.
+
+        Parameters:
+        - data: dict
+            transaction data.
+        """
+        transacted = {
+            "collection_name" : data['nft']['collection'],
+            "transaction_hash" : data['transaction'],
+            "transaction_timestamp" : data['event_timestamp'],
+            "identifier": data['nft']['identifier']
+        }
         if data['event_type'] == "transfer":
             #For transfer
-            self.db.run_query("neo4j",query2_transfer,parameters={"to_address":data['to_address'],
-                        "from_address" : data['from_address'],
-                        "transaction_hash" : data['transaction'],
-                        "collection_name" : data['nft']['collection'],
-                        "time_stamp":data['event_timestamp'],
-                        "event_type" : "Transfer",
-                        "identifier": data['nft']['identifier']})
-        else: #For sale
+            transacted["event_type"] = "Transfer"
+        else: 
             #For sale
+            transacted["event_type"] = "Sale and Transfer"
             if data['payment'] != None:
-                self.db.run_query("neo4j",query2_sale,parameters={"to_address":data['to_address'],
-                            "from_address": data['from_address'],
-                            "collection_name" : data['nft']['collection'],
-                            "transaction_hash" : data['transaction'],
-                            "time_stamp":data['event_timestamp'],
-                            "transaction_value" : data['payment']['quantity'],
-                            "transaction_token_symbol" : data['payment']['symbol'],
-                            "transaction_token_decimals" : data['payment']['decimals'],
-                            "transaction_token" : data['payment']['token_address'],
-                            "event_type" : "Sale and Transfer",
-                            "identifier": data['nft']['identifier']})
+                transacted["transaction_value"] = data['payment']['quantity']
+                transacted["transaction_token_symbol"] = data['payment']['symbol']
+                transacted["transaction_token_decimals"] = data['payment']['decimals']
+                transacted["transaction_token"] = data['payment']['token_address']
             else:
-                self.db.run_query("neo4j",query2_sale,parameters={"to_address":data['to_address'],
-                            "from_address": data['from_address'],
-                            "collection_name" : data['nft']['collection'],
-                            "transaction_hash" : data['transaction'],
-                            "time_stamp":data['event_timestamp'],
-                            "transaction_value" : 0,
-                            "transaction_token_symbol" : "unknown",
-                            "transaction_token_decimals" : "unknown",
-                            "transaction_token" : "unknown",
-                            "event_type" : "Sale and Transfer",
-                            "identifier": data['nft']['identifier']})
+                transacted["transaction_value"] = 0
+                transacted["transaction_token_symbol"] = "unknown"
+                transacted["transaction_token_decimals"] = "unknown"
+                transacted["transaction_token"] = "unknown"
+
+        return {"to_address": data['to_address'],
+                "from_address": data['from_address'],
+                "identifier": data['nft']['identifier'],
+                "collection_name": data['nft']['collection'],
+                "time_stamp": data['event_timestamp'],
+                "transacted": transacted}
         
     
+    def set_year_month_properties(self):
+        """
+        Store the year and month of the timestamp as properties on all TRANSACTED and MINT relationships 
+        which don't have them yet (e.g. relationships imported before the properties were introduced).
+        Relationships without a timestamp are skipped, they can't get a year.
+        The monthly statistics group by these properties instead of converting every timestamp at query time.
+        New TRANSACTED relationships get them when they are inserted, so this is a one-off migration which is run 
+        at startup if BACKFILL_YEAR_MONTH is set to true (see app/main.py), not with every update.
+        """
+        query_transacted = """
+        MATCH ()-[r:TRANSACTED]->()
+        WHERE r.year IS NULL AND r.transaction_timestamp IS NOT NULL
+        CALL {
+            WITH r
+            WITH r, datetime({epochSeconds: r.transaction_timestamp}) AS d
+            SET r.year = d.year, r.month = d.month
+        } IN TRANSACTIONS OF 10000 ROWS
+        """
+        query_mint = """
+        MATCH ()-[r:MINT]->()
+        WHERE r.year IS NULL AND r.date IS NOT NULL
+        CALL {
+            WITH r
+            WITH r, datetime({epochSeconds: r.date}) AS d
+            SET r.year = d.year, r.month = d.month
+        } IN TRANSACTIONS OF 10000 ROWS
+        """
+        self.db.run_query('neo4j', query_transacted)
+        self.db.run_query('neo4j', query_mint)
+
     def get_data_from_opensea(self,collection_name,current_time_unix,collection_address,ids_list):
         """
         Insert new transaction or transfer record into neo4j database.   
-        Skip updating if the last update block is close to current blocktime(difference less 2 days).
+        Only the NFTs which were not updated within the last 2 days are passed (see get_identifier_id_list).
         Parameters:
         - data: dict
             transaction data.
@@ -225,48 +280,139 @@ class UpdateFunctionality:
         - collection_address:str
             contract address of NFT collection.
         - ids_list:dict
-            dict storing identifier and last update blocktime.
+            dict storing identifier, last update blocktime and the saved cursor of the NFTs to update.
         """
         logging.info(f"Current time in unix:{current_time_unix}")
-        for id_info in ids_list:
-            last_updated_unix=int(id_info['updated_at'])
-            if (int(current_time_unix) - int(last_updated_unix))>= (2 * 86400):
-                try:
-                    result,status,status_code = query_api.query_nft_trx_data(collection_contract=collection_address,
-                                                                             identifier=id_info['id'],
-                                                                             after=last_updated_unix,
-                                                                             till=current_time_unix)
-                    if(len(result['asset_events']) != 0):
-                        for one in result['asset_events']:
-                            self.insert_new_trx_data(one)
-                        break
-                except Exception as err: #Error handle
-                    logging.error(err)
-                        
-                while result['next'] != "":
-                    try:
-                        result,status,status_code = query_api.query_nft_trx_data(collection_contract=collection_address,
-                                                                             identifier=id_info['id'],
-                                                                             after=last_updated_unix,
-                                                                             till=current_time_unix,
-                                                                             cursor=result['next'])
-                        if(len(result['asset_events']) != 0):
-                            for one in result['asset_events']:
-                                self.insert_new_trx_data(one)
-                    except Exception as err: #Error handle
-                        logging.error(err)
-                
-                if status_code == 200:   
-                    logging.info(f"Updating collection={collection_name}, identifier={id_info['id']}, last updated= {current_time_unix} done...")
-                    # print("Update one node fininsshed!",collection_name,id_info['id'],current_time_unix)
-                    self.update_nft_node(collection_name,id_info['id'],current_time_unix)
+        # the NFTs updated within the last 2 days are already excluded by get_identifier_id_list
+        logging.info(f"Updating {len(ids_list)} identifiers of collection={collection_name}")
+
+        # The requests to Opensea mostly wait for the API, therefore the events of several identifiers are fetched 
+        # at the same time by a few threads. The events are written by this thread, one identifier after the other 
+        # in the order of the list, so the writes to neo4j don't run concurrently.
+        # Only OPENSEA_FETCH_WINDOW identifiers are submitted at a time, a new one is submitted whenever the oldest 
+        # one is consumed, so the fetched pages waiting to be written stay bounded.
+        with ThreadPoolExecutor(max_workers=OPENSEA_WORKERS) as executor:
+            def submit(id_info):
+                # an NFT which wasn't fetched completely by the last update is resumed at the saved cursor, the 
+                # cursor is only valid for the time frame it was created for
+                cursor = id_info.get('update_cursor')
+                till = int(id_info['update_till']) if cursor else current_time_unix
+                return id_info['id'], till, executor.submit(self.fetch_identifier_events,
+                                                            collection_address,
+                                                            id_info['id'],
+                                                            int(id_info['updated_at']),
+                                                            till,
+                                                            cursor)
+
+            remaining_ids = iter(ids_list)
+            fetching = deque(submit(id_info) for id_info in islice(remaining_ids, OPENSEA_FETCH_WINDOW))
+
+            # The events of several identifiers are written together in one transaction of up to WRITE_BATCH_SIZE events.
+            # An identifier is only marked as updated once its events are written. The events of an identifier 
+            # which wasn't fetched completely are written as well and the cursor of the next page is saved, so the 
+            # next update resumes there instead of fetching the same pages again.
+            pending_events = []
+            pending_ids = []
+            while fetching:
+                identifier, till, future = fetching.popleft()
+                pages, cursor, complete = future.result()
+
+                next_id_info = next(remaining_ids, None)
+                if next_id_info is not None:
+                    fetching.append(submit(next_id_info))
+
+                if not complete and len(pages) == 0:
+                    continue
+                for events in pages:
+                    pending_events.extend(events)
+                pending_ids.append((identifier, till, cursor))
+
+                if len(pending_events) >= WRITE_BATCH_SIZE:
+                    self.write_events(collection_name,pending_events,pending_ids)
+                    pending_events = []
+                    pending_ids = []
+
+            self.write_events(collection_name,pending_events,pending_ids)
+
+    def write_events(self,collection_name,events,updates):
+        """
+        Insert the fetched events of several NFTs into neo4j database within one transaction and mark the NFTs as updated.
+        In case the transaction fails, none of the NFTs is marked as updated and no cursor is saved.
+        Parameters:
+        - collection_name: str
+            target collection.
+        - events: list
+            transaction data (asset_events as returned by Opensea).
+        - updates: list
+            (identifier, till, cursor) of the fetched NFTs, the cursor is None if the NFT is completely fetched 
+            till this time (unix), otherwise the cursor the next update resumes with.
+        """
+        try:
+            if len(events) != 0:
+                self.insert_new_trx_data(events)
+        except Exception as err: #Error handle
+            logging.error(err)
+            return
+
+        for identifier, till, cursor in updates:
+            if cursor is None:
+                logging.info(f"Updating collection={collection_name}, identifier={identifier}, last updated= {till} done...")
+                # print("Update one node fininsshed!",collection_name,id_info['id'],current_time_unix)
+                self.update_nft_node(collection_name,identifier,till)
             else:
-                logging.info(f"Skipping collection={collection_name}, identifier={id_info['id']}, last updated unix= {last_updated_unix} done...")
-                # print(f"Current block number:{current_blockNumber},last update blocknubmer={last_updated_blockNumber}")
+                logging.info(f"Updating collection={collection_name}, identifier={identifier} incomplete, resuming at cursor={cursor}")
+                self.save_update_cursor(collection_name,identifier,cursor,till)
+
+    def fetch_identifier_events(self,collection_address,identifier,last_updated_unix,current_time_unix,cursor=None):
+        """
+        Retrieve all new transaction records of one NFT from Opensea, following the cursor over all pages.
+        Returns the pages of events, the cursor to resume with and whether the NFT was fetched completely. In case 
+        a request failed or the page cap is reached, the pages fetched so far are returned together with the cursor 
+        of the next page, so they are written and the next update continues there instead of fetching them again.
+        Parameters:
+        - collection_address:str
+            contract address of NFT collection.
+        - identifier: str
+            which NFT to be queried.
+        - last_updated_unix: int
+            last update time of the NFT in unix.
+        - current_time_unix: str
+            time to stop update in unix.
+        - cursor: str
+            cursor saved by an incomplete update of the same time frame, None to start with the first page.
+        """
+        pages = []
+        while True:
+            try:
+                result,status,status_code = query_api.query_nft_trx_data(collection_contract=collection_address,
+                                                                         identifier=identifier,
+                                                                         after=last_updated_unix,
+                                                                         till=current_time_unix,
+                                                                         cursor=cursor)
+                if status_code != 200:
+                    raise Exception(f"Opensea returned status {status_code} for identifier={identifier}")
+                events = result['asset_events']
+            except Exception as err: #Error handle
+                logging.error(err)
+                return pages, cursor, False
+
+            # an empty page ends the pagination, Opensea sometimes returns a cursor even if there are no more events
+            if(len(events) == 0):
+                return pages, None, True
+            pages.append(events)
+            cursor = result.get('next')
+
+            if not cursor:
+                return pages, None, True
+
+            # defend against a cursor that never ends, the next update continues with the following pages
+            if len(pages) >= OPENSEA_PAGE_CAP:
+                logging.warning(f"Stop fetching identifier={identifier} after {OPENSEA_PAGE_CAP} pages")
+                return pages, cursor, False
             
     def update_nft_node(self,collection_name,identifier,updated_at):
         """
-        Update the NFT node .
+        Update the NFT node and remove the cursor of an incomplete update.
         Parameters:
         - updated_at: str
             latest update time.
@@ -275,12 +421,39 @@ class UpdateFunctionality:
         - identifier: str
             target which NFT to update.
         """
-        query = f"""
+        # updated_at is stored as a string
+        query = """
         MATCH(n:NFT)
-        WHERE n.collection_name = "{collection_name}" AND n.identifier='{identifier}'
-        SET n.updated_at = '{updated_at}'
+        WHERE n.collection_name = $collection_name AND n.identifier = $identifier
+        SET n.updated_at = $updated_at
+        REMOVE n.update_cursor, n.update_till
+        """
+        self.db.run_query('neo4j',query,parameters={'collection_name': collection_name,
+                    'identifier': str(identifier),
+                    'updated_at': str(updated_at)})
+
+    def save_update_cursor(self,collection_name,identifier,cursor,till):
         """
-        self.db.run_query('neo4j',query)
+        Save the cursor of an incomplete update on the NFT node, updated_at is left unchanged.
+        Parameters:
+        - collection_name: str
+            related collection.
+        - identifier: str
+            target which NFT to update.
+        - cursor: str
+            cursor of the next page to fetch.
+        - till: str
+            time the cursor was created for in unix.
+        """
+        query = """
+        MATCH(n:NFT)
+        WHERE n.collection_name = $collection_name AND n.identifier = $identifier
+        SET n.update_cursor = $cursor, n.update_till = $till
+        """
+        self.db.run_query('neo4j',query,parameters={'collection_name': collection_name,
+                    'identifier': str(identifier),
+                    'cursor': cursor,
+                    'till': str(till)})
            
     def update_update_info(self,latest_block_time,collection_name):
         """
@@ -291,18 +464,19 @@ class UpdateFunctionality:
         - collection_name: str
             related collection.
         """
-        query = f"""
+        query = """
         MATCH(n:Update_Info)
-        WHERE n.collection_name = "{self.get_processed_collection_name(collection_name)}"
-        SET n.updated_at = '{latest_block_time}'
+        WHERE n.collection_name = $collection_name
+        SET n.updated_at = $updated_at
         """
-        self.db.run_query('neo4j',query)
+        self.db.run_query('neo4j',query,parameters={'collection_name': self.get_processed_collection_name(collection_name),
+                    'updated_at': str(latest_block_time)})
         
     def get_last_update(self):
         """
         Retrieve last update time.
         """
-        query = f"""
+        query = """
         MATCH(n:Update_Info)
         RETURN n.collection_name AS name, n.updated_at as update_time
         """
@@ -321,23 +495,16 @@ class UpdateFunctionality:
         - collection_name: str
             collection name to be processed
         """
-        if collection_name == 'degods-eth':
-            return 'degods'
-        elif collection_name == 'boredapeyachtclub':
-            return 'boredapeyachtclub'
-        elif collection_name =='complete':
-            return 'complete'
-        else:
-            return collection_name
+        return PROCESSED_COLLECTION_NAMES.get(collection_name, collection_name)
         
         
     def get_update_frequency(self,collection_name):
-        query = f"""
+        query = """
         MATCH(n:Update_Info)
-        WHERE n.collection_name = '{self.get_processed_collection_name(collection_name)}'
+        WHERE n.collection_name = $collection_name
         RETURN n.update_frequency AS frequency
         """
-        result = self.db.run_query('neo4j', query)
+        result = self.db.run_query('neo4j', query, parameters={'collection_name': self.get_processed_collection_name(collection_name)})
         if len(result) > 0:
             return result[0]['frequency']
         else:
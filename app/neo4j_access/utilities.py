@@ -1,25 +1,167 @@
 from typing import List
+from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import Future
 from app.exceptions.not_exists import NotExistsException
+import calendar
+import threading
 
 """
 Author: Valentin Leuthe 
 """
 
+@lru_cache(maxsize=1024)
+def _month_start(year: int, month: int):
+    """
+    Returns the unix timestamp (UTC) of the first second of the month. The few months the endpoints 
+    are queried for are computed once and looked up afterwards.
+    """
+
+    # months after December continue in the next year
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return calendar.timegm((year, month, 1, 0, 0, 0))
+
+@lru_cache(maxsize=256)
+def _months(year_from: int, year_to: int, month_from: int, month_to: int):
+    """
+    Returns every (year, month) of the time frame in chronological order. The months are numbered 
+    consecutively (year * 12 + month - 1), so no carry over from December to January is needed.
+    """
+
+    month_numbers = range(year_from * 12 + month_from - 1, year_to * 12 + month_to)
+    return tuple((month_number // 12, month_number % 12 + 1) for month_number in month_numbers)
+
+class MonthCache:
+    """
+    Bounded cache of monthly results, keyed by (key, (year, month)). Overlapping time frames reuse the months 
+    which were already loaded and only the missing months are loaded. The least recently used months are 
+    evicted once maxsize entries are cached. The cache is shared by the request threads, the lock is only held 
+    for the lookup and the insert, the months are loaded outside of it. A month which is being loaded by another 
+    thread is registered as a future and waited for, so it is not loaded twice.
+
+    Parameters:
+    - maxsize: int
+        maximum number of cached months (over all keys)
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._loading = {}
+        # incremented by clear, months loaded before a clear are returned but not cached
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _consecutive_runs(months):
+        """
+        Splits the (year, month) pairs in chronological order into runs of consecutive months.
+        """
+        runs = []
+        previous = None
+        for year, month in months:
+            index = year * 12 + month
+            if previous is None or index != previous + 1:
+                runs.append([])
+            runs[-1].append((year, month))
+            previous = index
+        return runs
+
+    def get_months(self, key, months, load_months, empty):
+        """
+        Returns a dictionary {(year, month): value} for the given months.
+
+        Parameters:
+        - key: hashable
+            everything besides the month the cached values depend on (e.g. query and collection)
+        - months: List[tuple]
+            the (year, month) pairs of the time frame in chronological order
+        - load_months: function
+            called with the first and the last (year, month) of a run of consecutive missing months, returns a 
+            dictionary {(year, month): value} for the months between them. Each run is loaded with a single call, 
+            the cached months between two runs are not loaded again
+        - empty:
+            value of the months which are not included in the loaded dictionary
+        """
+
+        result = {}
+        missing = []
+        waiting = {}
+        with self._lock:
+            generation = self._generation
+            for month in months:
+                entry_key = (key, month)
+                if entry_key in self._entries:
+                    self._entries.move_to_end(entry_key)
+                    result[month] = self._entries[entry_key]
+                elif entry_key in self._loading:
+                    waiting[month] = self._loading[entry_key]
+                else:
+                    self._loading[entry_key] = Future()
+                    missing.append(month)
+
+        try:
+            for run in self._consecutive_runs(missing):
+                loaded = load_months(run[0], run[-1])
+                with self._lock:
+                    for month in run:
+                        value = loaded.get(month, empty)
+                        result[month] = value
+                        if generation == self._generation:
+                            self._entries[(key, month)] = value
+                        self._loading.pop((key, month)).set_result(value)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+        except BaseException as err:
+            # the waiting threads get the error as well, the months are loaded again with the next request
+            with self._lock:
+                for month in missing:
+                    future = self._loading.get((key, month))
+                    if future is not None and not future.done():
+                        del self._loading[(key, month)]
+                        future.set_exception(err)
+            raise
+
+        for month, future in waiting.items():
+            result[month] = future.result()
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+# base paths of the links to etherscan and opensea
+ETHERSCAN_ADDRESS_URL = "https://etherscan.io/address/"
+ETHERSCAN_TRANSACTION_URL = "https://etherscan.io/tx/"
+OPENSEA_DEGODS_URL = "https://opensea.io/assets/ethereum/0x8821bee2ba0df28761afff119d66390d594cd280/"
+OPENSEA_BOREDAPES_URL = "https://opensea.io/assets/ethereum/0xbc4ca0eda7647a8ab7c2061c2e118a18a936f13d/"
+
+# collections as they come from the endpoints and their name in the database ("all" = both collections)
+COLLECTIONS = {
+    frozenset({"BOREDAPES"}): "boredapeyachtclub",
+    frozenset({"DEGODS"}): "degods-eth",
+    frozenset({"BOREDAPES", "DEGODS"}): "all",
+}
+
 class Utilities:
 
-    def get_etherscan_url_address(self, hash: str):
-        base_path = "https://etherscan.io/address/"
-        return base_path + hash
+    # the links only depend on their arguments, they are static so they can be called without an instance
+
+    @staticmethod
+    def get_etherscan_url_address(hash: str):
+        return ETHERSCAN_ADDRESS_URL + hash
     
-    def get_etherscan_url_transaction(self, hash: str):
-        base_path = "https://etherscan.io/tx/"
-        return base_path + hash
+    @staticmethod
+    def get_etherscan_url_transaction(hash: str):
+        return ETHERSCAN_TRANSACTION_URL + hash
     
-    def get_opensea_url(self, collection: str, identifier: str):
+    @staticmethod
+    def get_opensea_url(collection: str, identifier: str):
         if collection.upper() == "DEGODS-ETH":
-            base_path = "https://opensea.io/assets/ethereum/0x8821bee2ba0df28761afff119d66390d594cd280/"
+            base_path = OPENSEA_DEGODS_URL
         else:
-            base_path = "https://opensea.io/assets/ethereum/0xbc4ca0eda7647a8ab7c2061c2e118a18a936f13d/"
+            base_path = OPENSEA_BOREDAPES_URL
 
         return base_path + str(identifier)
     
@@ -38,12 +180,67 @@ class Utilities:
         - NotExistException: if the specified collection doesn't exist
         """
 
-        collection_upper = [item.upper() for item in collection]
-        if len(collection_upper) == 1 and collection_upper[0] == "BOREDAPES":
-            return "boredapeyachtclub"
-        elif len(collection_upper) == 1 and collection_upper[0] == "DEGODS":
-            return "degods-eth"
-        elif len(collection_upper) == 2 and "BOREDAPES" in collection_upper and "DEGODS" in collection_upper:
-            return "all"
-        else:
-            raise NotExistsException(f"Collection {collection} does not exist")
\ No newline at end of file
+        collection_processed = COLLECTIONS.get(frozenset(item.upper() for item in collection))
+        if collection_processed is None:
+            raise NotExistsException(f"Collection {collection} does not exist")
+
+        return collection_processed
+
+    def get_collection_parameter(self, collection_processed: str):
+
+        """
+        method returns the value for the $collection query parameter. In case both collections are considered, 
+        the parameter is null and the collection filter of the queries is skipped 
+        (WHERE $collection IS NULL OR r.collection_name = $collection).
+
+        Parameters:
+        - collection_processed: str
+            collection as it is returned by get_collection
+        """
+
+        return None if collection_processed == "all" else collection_processed
+
+    def get_timestamp_range(self, year_from: int, year_to: int, month_from: int, month_to: int):
+
+        """
+        method turns the time frame as it comes as parameters from the endpoint into a range of 
+        unix timestamps (UTC), as they are stored on the relationships in the database. 
+        The range includes ts_from and excludes ts_to, which allows a plain comparison 
+        ts_from <= timestamp < ts_to in the queries instead of converting every timestamp into a datetime.
+
+        Parameters:
+        - year_from: int
+            The start year for the time frame
+        - year_to: int
+            The end year for the time frame.
+        - month_from: int 
+            The start month for the time frame.
+        - month_to: int 
+            The end month for the time frame
+
+        Returns:
+            tuple (ts_from, ts_to): first second of month_from and first second of the month after month_to
+        """
+
+        ts_from = _month_start(year_from, month_from)
+        ts_to = _month_start(year_to, month_to + 1)
+
+        return ts_from, ts_to
+
+    def get_months(self, year_from: int, year_to: int, month_from: int, month_to: int):
+
+        """
+        method returns every month of the time frame as (year, month) tuples in chronological order.
+
+        Parameters:
+        - year_from: int
+            The start year for the time frame
+        - year_to: int
+            The end year for the time frame.
+        - month_from: int 
+            The start month for the time frame.
+        - month_to: int 
+            The end month for the time frame
+        """
+
+        return _months(year_from, year_to, month_from, month_to)
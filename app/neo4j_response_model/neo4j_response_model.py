@@ -154,4 +154,13 @@ class HistoryResponse(BaseModel):
 
 class HistoryResponseCollectionDistribution(BaseModel):
     collections: List[str]
-    counts: List[float]
\ No newline at end of file
+    counts: List[float]
+
+# Response model for the dashboard endpoint, all daily histories share the same dates
+class HistoryDashboardResponse(BaseModel):
+    dates: List[str]
+    transactions: List[float]
+    mints: List[float]
+    active_users: List[float]
+    active_users_transacting: List[float]
+    active_users_mint: List[float]
@@ -1,9 +1,22 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 import os
 import json
 from web3 import Web3
 import datetime
+import time
+from functools import lru_cache
+
+# All requests share one session, so the connections (and their TLS handshakes) are reused across pages and NFTs.
+# The pool is large enough for the identifiers fetched in parallel, failed connections and rate limits are retried.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                                       max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))))
+
+OPENSEA_EVENTS_URL = "https://api.opensea.io/api/v2/events/chain/ethereum/contract/{}/nfts/{}"
+OPENSEA_EVENT_TYPES = ("sale", "transfer")
 
 #Query Transfer, Sale, and Offer event using Opensea Api
 def query_nft_trx_data(collection_contract,identifier,after,till,cursor=None):
@@ -26,23 +39,35 @@ def query_nft_trx_data(collection_contract,identifier,after,till,cursor=None):
     else:
         status=f"Querying on identifier = {identifier}, with cursor:{cursor}....."
         
+    url = OPENSEA_EVENTS_URL.format(collection_contract, identifier)
+    params = {"event_type": OPENSEA_EVENT_TYPES, "limit": 50, "after": after, "before": till}
     if cursor != None:
-        url = f"https://api.opensea.io/api/v2/events/chain/ethereum/contract/{collection_contract}/nfts/{identifier}?event_type=sale&event_type=transfer&limit=50&after={after}&before={till}&next={cursor}"
-    else:
-        url = f"https://api.opensea.io/api/v2/events/chain/ethereum/contract/{collection_contract}/nfts/{identifier}?event_type=sale&event_type=transfer&limit=50&after={after}&before={till}"
+        params["next"] = cursor
     headers = {
         "accept": "application/json",
         "x-api-key": os.getenv("OPENSEA_API_KEY")
     }
-    response = requests.get(url, headers=headers)
+    response = _SESSION.get(url, params=params, headers=headers)
     status_co = response.status_code
     response = response.json()
 
     return response,status,status_co
+# a new block is created about every 12 seconds, the latest block timestamp is reused for this many seconds
+BLOCKTIME_TTL = 10
+_latest_blocktime = (float("-inf"), None)
+
+# the block of a timestamp only changes until the next block is created, older timestamps are cached
+BLOCK_NUMBER_FINAL_AFTER = 60
+
 def get_current_blocktime():
     """
     Get current blocktime of Ethereum using free cloudflare endpoint.
+    The result is cached for BLOCKTIME_TTL seconds.
     """
+    global _latest_blocktime
+    fetched_at, block_timestamp = _latest_blocktime
+    if time.monotonic() - fetched_at < BLOCKTIME_TTL:
+        return block_timestamp
 
     # Connect to a public Ethereum node provided by Cloudflare
     web3 = Web3(Web3.HTTPProvider('https://cloudflare-eth.com'))
@@ -56,12 +81,26 @@ def get_current_blocktime():
 
     # Extract the timestamp from the latest block
     block_timestamp = latest_block['timestamp']
+    _latest_blocktime = (time.monotonic(), block_timestamp)
     return block_timestamp
 def convert_unix_to_blockNumber(unix):
+    # only the blocks of past timestamps are final and can be cached, failed lookups are never cached
+    try:
+        if str(unix).isdigit() and int(unix) < time.time() - BLOCK_NUMBER_FINAL_AFTER:
+            return _final_block_number(unix)
+        return _query_block_number(unix)
+    except LookupError:
+        return False
+
+@lru_cache(maxsize=8192)
+def _final_block_number(unix):
+    return _query_block_number(unix)
+
+def _query_block_number(unix):
     ETHERSCAN_API= os.getenv("ETHERSCAN_API")
     url = f"https://api.etherscan.io/api?module=block&action=getblocknobytime&timestamp={unix}&closest=before&apikey={ETHERSCAN_API}"
 
-    response = requests.get(url)
+    response = _SESSION.get(url)
 
     # Parse the response JSON
     data = response.json()
@@ -69,13 +108,13 @@ def convert_unix_to_blockNumber(unix):
         # print(data['result'])
         return (data['result'])
     else:
-        return False
+        raise LookupError(data.get('result'))
     
 def get_current_blocktime_v2():
 
     url = f"https://api.blockcypher.com/v1/eth/main"
 
-    response = requests.get(url)
+    response = _SESSION.get(url)
 
     # Parse the response JSON
     data = response.json()
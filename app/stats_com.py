@@ -3,14 +3,16 @@ import json
 
 
 
-def count_nodes(db,id):
-    query = f"""
+def count_nodes(db,ids):
+    # counts the NFTs of all given communities with one query, communities without NFTs are counted as 0
+    query = """
     MATCH(n:NFT)
-    WHERE n.boredapeyachtclub_com_id_list[0] = {id}
-    RETURN count(n) as count
+    WHERE n.boredapeyachtclub_com_id_list[0] IN $ids
+    RETURN n.boredapeyachtclub_com_id_list[0] as id, count(n) as count
     """
-    result =db.run_query('neo4j',query)
-    return (result[0]['count'])
+    result =db.run_query('neo4j',query,{"ids": ids})
+    counts = {record['id']: record['count'] for record in result}
+    return [counts.get(id, 0) for id in ids]
 
 def testing_stats():
     db= get_db()
@@ -24,9 +26,7 @@ def testing_stats():
     complete = json.loads(p['complete_id_list']) 
     deg= json.loads(p['degods_id_list'])
     bored=  json.loads(p['boredapeyachtclub_id_list'])
-    counter=[]
-    for i in bored[0]:
-        counter.append(count_nodes(db,i))
+    counter=count_nodes(db,bored[0])
 
         
     print(counter)
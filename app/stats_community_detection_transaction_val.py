@@ -11,12 +11,16 @@ import random
 import string
 import json
 import matplotlib.pyplot as plt
-import statistics
+import numpy as np
+from itertools import groupby
+from operator import itemgetter
 load_dotenv()
 
 class Neo4jInstance:
     def __init__(self, uri, user, password):
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        # names of the graph projections which are known to exist, a projection persists until it is dropped
+        self._graph_ready = set()
     
     def close(self):
         self.driver.close()
@@ -26,6 +30,12 @@ class Neo4jInstance:
             result = session.run(query, parameters)
             return [record for record in result]
 
+    def run_query_stream(self, target_db, query, parameters=None):
+        # yields the records one at a time while they are fetched, instead of materializing the whole result
+        with self.driver.session(database=target_db) as session:
+            result = session.run(query, parameters)
+            yield from result
+
     def test_connection(self,target_db):
         try:
             with self.driver.session(database=target_db)  as session:
@@ -38,8 +48,11 @@ class Neo4jInstance:
         
 
 
-    def test_query_community_detection(self):
-        print(self.test_connection('neo4j'))
+    def ensure_account_graph(self):
+        # the graph catalog is only checked the first time, afterwards the projection is known to exist
+        if 'accountGraph' in self._graph_ready:
+            return
+
         list_graphs = self.run_query('neo4j', "CALL gds.graph.list()")
         graph_names = [graph["graphName"] for graph in list_graphs]
 
@@ -51,8 +64,13 @@ class Neo4jInstance:
                 ['TRANSACTED']
             )
             """)
+        self._graph_ready.add('accountGraph')
 
-        result = self.run_query('neo4j', """
+    def test_query_community_detection(self):
+        print(self.test_connection('neo4j'))
+        self.ensure_account_graph()
+
+        result = self.run_query_stream('neo4j', """
         CALL gds.louvain.stream('accountGraph')
         YIELD nodeId, communityId, intermediateCommunityIds
         RETURN gds.util.asNode(nodeId).address AS address, communityId
@@ -63,32 +81,20 @@ class Neo4jInstance:
 
     def test_query_community_detection_v2(self):
         print(self.test_connection('neo4j'))
-        list_graphs = self.run_query('neo4j', "CALL gds.graph.list()")
-        graph_names = [graph["graphName"] for graph in list_graphs]
-
-        if 'accountGraph' not in graph_names:
-            self.run_query('neo4j', """
-            CALL gds.graph.project(
-                'accountGraph',
-                'Account',
-                ['TRANSACTED']
-            )
-            """)
+        self.ensure_account_graph()
 
-        result = self.run_query('neo4j', """
+        result = self.run_query_stream('neo4j', """
         CALL gds.louvain.stream('accountGraph')
         YIELD nodeId, communityId, intermediateCommunityIds
         RETURN gds.util.asNode(nodeId).address AS address, communityId
         ORDER BY communityId ASC
         """)
 
-        community_dict = {}
-        for record in result:
-            address = record["address"]
-            community_id = record["communityId"]
-            if community_id not in community_dict:
-                community_dict[community_id] = []
-            community_dict[community_id].append(address)
+        # the records are ordered by their community, every community is therefore one consecutive group
+        community_dict = {
+            community_id: [record["address"] for record in records]
+            for community_id, records in groupby(result, key=itemgetter("communityId"))
+        }
 
         return community_dict
     
@@ -115,24 +121,23 @@ def main():
     
     # plot the community sizes
     # Calculate the size of each community
-    community_sizes = [len(addresses) for addresses in result.values()] 
+    community_sizes = np.fromiter((len(addresses) for addresses in result.values()), dtype=np.int64, count=len(result))
     # Filter the sizes to include only communities with size < 20
-    filtered_community_sizes = [size for size in community_sizes if size < 20]
-
-    # plot basic statistics for community sizes 
-    print(f"Biggest community includes {max(community_sizes)} accounts")
-    print(f"{community_sizes.count(1)} communities are of size one")
-    print(f"{sum(1 for size in community_sizes if size > 10)} communities include more than 10 addresses")
-    print(f"{sum(1 for size in community_sizes if size > 20)} communities include more than 20 addresses")
-    print(f"{sum(1 for size in community_sizes if size > 50)} communities include more than 50 addresses")
-    print(f"{sum(1 for size in community_sizes if size > 100)} communities include more than 100 addresses")
-    print(f"The average community size is {statistics.mean(community_sizes)}")
-    print(f"The median community size is {statistics.median(community_sizes)}")
-
-    # Sort the community sizes in descending order
-    sorted_sizes = sorted(community_sizes, reverse=True)
-    # Take the sizes of the 20 largest communities
-    top_20_sizes = sorted_sizes[:30]
+    filtered_community_sizes = community_sizes[community_sizes < 20]
+
+    # plot basic statistics for community sizes, the threshold counts are computed in one pass over the sizes
+    thresholds = np.array([10, 20, 50, 100])
+    threshold_counts = (community_sizes[:, None] > thresholds).sum(axis=0)
+    print(f"Biggest community includes {community_sizes.max()} accounts")
+    print(f"{np.count_nonzero(community_sizes == 1)} communities are of size one")
+    for threshold, threshold_count in zip(thresholds, threshold_counts):
+        print(f"{threshold_count} communities include more than {threshold} addresses")
+    print(f"The average community size is {community_sizes.mean()}")
+    print(f"The median community size is {np.median(community_sizes)}")
+
+    # Take the sizes of the 30 largest communities (in descending order), only these are sorted
+    top_count = min(30, len(community_sizes))
+    top_20_sizes = np.sort(np.partition(community_sizes, -top_count)[-top_count:])[::-1]
     # Create a bar plot
     plt.figure(figsize=(10, 6))
     plt.bar(range(len(top_20_sizes)), top_20_sizes, color='skyblue')
@@ -149,7 +154,10 @@ def main():
     
     # Plot the histogram
     plt.figure(figsize=(10, 6))
-    plt.hist(filtered_community_sizes, bins=range(1, max(filtered_community_sizes) + 1), edgecolor='black', align='left')
+    # the communities are counted with np.histogram on the bins of plt.hist (the last bin includes its right edge), 
+    # the bars are centered on the left edges as with align='left'
+    size_counts, edges = np.histogram(filtered_community_sizes, bins=range(1, max(filtered_community_sizes) + 1))
+    plt.bar(edges[:-1], size_counts, width=np.diff(edges), edgecolor='black')
 
     plt.xlabel('Community Size (Number of Addresses)')
     plt.ylabel('Count of Communities')